@@ -9,10 +9,11 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 import logging
 from datetime import datetime, timedelta
 
-from app.core.database import get_db, get_mongodb, get_redis
+from app.core.database import get_db, get_mongodb, get_redis, get_async_redis
 from app.core.security import verify_token, get_subject_from_token
 from app.core.config import settings
 from app.models.user import User
@@ -143,7 +144,7 @@ async def get_user_service(
 
 
 async def get_cache_service(
-    redis_client: Redis = Depends(get_redis)
+    redis_client: AsyncRedis = Depends(get_async_redis)
 ) -> CacheService:
     """
     Get CacheService instance
@@ -5,7 +5,9 @@ Provides DialoGPT-based career coaching and guidance
 
 from typing import Any, List, Dict, Optional
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+import json
 import logging
 from datetime import datetime
 
@@ -263,6 +265,35 @@ async def send_message(request: SendMessageRequest):
         )
 
 
+@router.post("/message/stream")
+async def send_message_stream(request: SendMessageRequest):
+    """Send a message and stream the AI career coach's reply as server-sent events"""
+    if not CONVERSATIONAL_AI_AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Streaming responses require the conversational AI service"
+        )
+    
+    # Convert context string to enum if provided
+    context = None
+    if request.context:
+        try:
+            context = ConversationContext(request.context)
+        except ValueError:
+            context = ConversationContext.GENERAL
+    
+    async def event_stream():
+        # "text" events carry reply chunks; the final "done" event matches the /message response
+        async for event in conversational_ai_service.send_message_stream(
+            session_id=request.session_id,
+            message=request.message,
+            context=context
+        ):
+            yield f"data: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @router.get("/history/{session_id}", response_model=ConversationHistoryResponse)
 async def get_conversation_history(session_id: str):
     """Get conversation history for a session"""
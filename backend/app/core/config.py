@@ -45,6 +45,9 @@ class Settings:
     DB_MAX_OVERFLOW: int = 20
     DB_POOL_TIMEOUT: int = 30
     DB_POOL_RECYCLE: int = 3600
+    REDIS_MAX_CONNECTIONS: int = 64
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 10
     
     # Celery
     CELERY_BROKER_URL: str = "redis://redis:6379/0"
@@ -106,6 +109,11 @@ class Settings:
     AI_REQUEST_TIMEOUT: int = 30
     AI_MAX_RETRIES: int = 3
     AI_RETRY_DELAY: int = 1
+    EMBEDDING_ONNX_MODEL_PATH: Optional[str] = None  # optimum-exported MiniLM, enables ONNX Runtime encoding
+    AUDIO_TORCH_COMPILE: bool = False  # torch.compile the SpeechT5 decoder and vocoder at startup
+    AUDIO_CPU_BACKEND: str = "torch"  # torch | ipex | int8; SpeechT5 optimization used on CPU-only hosts
+    CHAT_TORCH_COMPILE: bool = False  # torch.compile the DialoGPT forward pass at startup
+    CHAT_CT2_MODEL_DIR: Optional[str] = None  # CTranslate2-converted DialoGPT, used on CPU-only hosts
     
     # Job Matching Settings
     JOB_MATCH_THRESHOLD: float = 0.7
@@ -130,10 +138,19 @@ class Settings:
         self.DATABASE_URL = os.getenv("DATABASE_URL", self.DATABASE_URL)
         self.MONGODB_URL = os.getenv("MONGODB_URL", self.MONGODB_URL)
         self.REDIS_URL = os.getenv("REDIS_URL", self.REDIS_URL)
+        self.MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", self.MONGODB_MAX_POOL_SIZE))
+        self.MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", self.MONGODB_MIN_POOL_SIZE))
 
         # Security
         self.SECRET_KEY = os.getenv("SECRET_KEY", self.SECRET_KEY)
 
+        # AI models
+        self.EMBEDDING_ONNX_MODEL_PATH = os.getenv("EMBEDDING_ONNX_MODEL_PATH", self.EMBEDDING_ONNX_MODEL_PATH)
+        self.AUDIO_TORCH_COMPILE = os.getenv("AUDIO_TORCH_COMPILE", "false").lower() == "true"
+        self.AUDIO_CPU_BACKEND = os.getenv("AUDIO_CPU_BACKEND", self.AUDIO_CPU_BACKEND).lower()
+        self.CHAT_TORCH_COMPILE = os.getenv("CHAT_TORCH_COMPILE", "false").lower() == "true"
+        self.CHAT_CT2_MODEL_DIR = os.getenv("CHAT_CT2_MODEL_DIR", self.CHAT_CT2_MODEL_DIR)
+
         # Validate environment
         allowed_envs = ["development", "staging", "production", "testing"]
         if self.ENVIRONMENT not in allowed_envs:
@@ -8,6 +8,7 @@ from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
 from motor.motor_asyncio import AsyncIOMotorClient
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis, ConnectionPool as AsyncConnectionPool
 from typing import Generator, Optional
 import logging
 
@@ -91,7 +92,12 @@ class MongoDB:
     async def connect(self):
         """Connect to MongoDB"""
         try:
-            self.client = AsyncIOMotorClient(settings.MONGODB_URL)
+            # Warm connections are kept open so concurrent requests don't pay connection setup
+            self.client = AsyncIOMotorClient(
+                settings.MONGODB_URL,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                minPoolSize=settings.MONGODB_MIN_POOL_SIZE
+            )
             # Test connection
             await self.client.admin.command('ping')
             
@@ -132,11 +138,25 @@ async def get_mongodb():
 
 
 # Redis Setup
+# Connection pool shared by every asyncio client; connections are opened lazily
+async_redis_pool = AsyncConnectionPool.from_url(
+    settings.REDIS_URL,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    decode_responses=False,
+    socket_connect_timeout=5,
+    socket_timeout=5,
+    socket_keepalive=True,
+    retry_on_timeout=True,
+    health_check_interval=30
+)
+
+
 class RedisManager:
     """Redis connection manager"""
     
     def __init__(self):
         self.redis: Optional[Redis] = None
+        self.async_redis: Optional[AsyncRedis] = None
     
     def connect(self):
         """Connect to Redis"""
@@ -169,6 +189,12 @@ class RedisManager:
         if not self.redis:
             self.connect()
         return self.redis
+    
+    def get_async_client(self) -> AsyncRedis:
+        """Get asyncio Redis client; responses stay bytes so binary payloads survive"""
+        if not self.async_redis:
+            self.async_redis = AsyncRedis(connection_pool=async_redis_pool)
+        return self.async_redis
 
 
 # Global Redis instance
@@ -180,6 +206,11 @@ def get_redis() -> Redis:
     return redis_manager.get_client()
 
 
+def get_async_redis() -> AsyncRedis:
+    """Asyncio Redis dependency for FastAPI"""
+    return redis_manager.get_async_client()
+
+
 # Database Health Check
 async def check_database_health() -> dict:
     """Check health of all database connections"""
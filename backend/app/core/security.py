@@ -5,13 +5,16 @@ Handles JWT tokens, password hashing, and authentication
 
 from datetime import datetime, timedelta
 from typing import Optional, Union, Any
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
 from passlib.hash import bcrypt
 import secrets
 import string
 from fastapi import HTTPException, status
+from cachetools import TTLCache
+import hashlib
 import logging
+import threading
 
 from .config import settings
 
@@ -20,6 +23,15 @@ logger = logging.getLogger(__name__)
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# HMAC key built once; jose otherwise reconstructs it from SECRET_KEY on every encode and decode
+_jwt_key = jwk.construct(settings.SECRET_KEY, settings.ALGORITHM)
+
+# Payloads of recently verified tokens, keyed by a digest so raw tokens are never kept
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_TTL = 30  # seconds
+_verified_tokens = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=TOKEN_CACHE_TTL)
+_verified_tokens_lock = threading.Lock()  # sync dependencies run in the threadpool
+
 
 def create_access_token(
     subject: Union[str, Any], 
@@ -53,7 +65,7 @@ def create_access_token(
         to_encode.update(additional_claims)
     
     try:
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, _jwt_key, algorithm=settings.ALGORITHM)
         return encoded_jwt
     except Exception as e:
         logger.error(f"Error creating access token: {e}")
@@ -90,7 +102,7 @@ def create_refresh_token(
     }
     
     try:
-        encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        encoded_jwt = jwt.encode(to_encode, _jwt_key, algorithm=settings.ALGORITHM)
         return encoded_jwt
     except Exception as e:
         logger.error(f"Error creating refresh token: {e}")
@@ -112,7 +124,7 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
         Decoded token payload or None if invalid
     """
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = _decode_token(token)
         
         # Check token type
         if payload.get("type") != token_type:
@@ -135,6 +147,21 @@ def verify_token(token: str, token_type: str = "access") -> Optional[dict]:
         return None
 
 
+def _decode_token(token: str) -> dict:
+    """Decode a JWT, reusing the payload of a token verified within TOKEN_CACHE_TTL seconds"""
+    # OpenSSL's SHA-256 runs on SHA-NI where available, beating blake2b for ~500-byte tokens
+    cache_key = hashlib.sha256(token.encode()).digest()[:16]
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(cache_key)
+    
+    if payload is None:
+        payload = jwt.decode(token, _jwt_key, algorithms=[settings.ALGORITHM])
+        with _verified_tokens_lock:
+            _verified_tokens[cache_key] = payload
+    
+    return payload
+
+
 def get_subject_from_token(token: str, token_type: str = "access") -> Optional[str]:
     """
     Extract subject (user ID) from a JWT token
@@ -211,7 +238,7 @@ def generate_password_reset_token(email: str) -> str:
         "iat": now
     }
     
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(to_encode, _jwt_key, algorithm=settings.ALGORITHM)
 
 
 def verify_password_reset_token(token: str) -> Optional[str]:
@@ -251,7 +278,7 @@ def generate_email_verification_token(email: str) -> str:
         "iat": now
     }
     
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    return jwt.encode(to_encode, _jwt_key, algorithm=settings.ALGORITHM)
 
 
 def verify_email_verification_token(token: str) -> Optional[str]:
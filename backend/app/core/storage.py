@@ -0,0 +1,84 @@
+"""
+Object storage client management for SkillForge AI
+"""
+
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from typing import Any, Dict, Tuple
+
+from .config import settings
+
+try:
+    import aioboto3
+    from botocore.config import Config
+    AIOBOTO3_AVAILABLE = True
+except ImportError:
+    AIOBOTO3_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# S3 client settings: a larger connection pool than botocore's default of 10,
+# adaptive retries and TCP keepalive
+S3_CLIENT_OPTIONS = {
+    'max_pool_connections': 64,
+    'retries': {'max_attempts': 5, 'mode': 'adaptive'},
+    'tcp_keepalive': True
+}
+
+
+class S3Manager:
+    """S3 connection manager"""
+    
+    def __init__(self):
+        # aiohttp connectors are bound to the loop that opened them, so each running
+        # loop gets its own client, owned by an exit stack that closes it
+        self._clients: Dict[asyncio.AbstractEventLoop, Tuple[AsyncExitStack, Any]] = {}
+        self._locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+    
+    async def get_client(self):
+        """Get the S3 client for the running event loop, opening it on first use"""
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is not None:
+            return entry[1]
+        
+        if not AIOBOTO3_AVAILABLE:
+            raise RuntimeError("aioboto3 is not installed")
+        
+        lock = self._locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            entry = self._clients.get(loop)
+            if entry is None:
+                # Forget clients of loops that have since been closed (workers, tests, CLI runs)
+                for closed_loop in [other for other in self._clients if other.is_closed()]:
+                    del self._clients[closed_loop]
+                    self._locks.pop(closed_loop, None)
+                
+                # Unset credentials fall back to boto's default provider chain
+                session = aioboto3.Session(
+                    aws_access_key_id=getattr(settings, 'AWS_ACCESS_KEY_ID', None),
+                    aws_secret_access_key=getattr(settings, 'AWS_SECRET_ACCESS_KEY', None),
+                    region_name=getattr(settings, 'AWS_REGION', None)
+                )
+                stack = AsyncExitStack()
+                client = await stack.enter_async_context(
+                    session.client('s3', config=Config(**S3_CLIENT_OPTIONS))
+                )
+                entry = self._clients[loop] = (stack, client)
+                logger.info("Opened S3 client")
+        
+        return entry[1]
+    
+    async def close(self):
+        """Close the S3 client opened on the running event loop"""
+        loop = asyncio.get_running_loop()
+        self._locks.pop(loop, None)
+        entry = self._clients.pop(loop, None)
+        if entry is not None:
+            await entry[0].aclose()
+            logger.info("Closed S3 client")
+
+
+# Global S3 instance
+s3_manager = S3Manager()
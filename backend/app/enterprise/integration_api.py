@@ -5,8 +5,6 @@ Comprehensive enterprise features including SSO, bulk operations, and custom int
 
 import asyncio
 import logging
-import json
-import xml.etree.ElementTree as ET
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass
@@ -21,7 +19,7 @@ from saml2.client import Saml2Client
 from authlib.integrations.requests_client import OAuth2Session
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from pydantic import BaseModel, Field
 
 from app.core.database import get_db
@@ -50,6 +48,30 @@ class ProvisioningAction(Enum):
     SUSPEND = "suspend"
     ACTIVATE = "activate"
 
+# Lookup tables so the bulk loops don't build enum members or field lists per item
+_PROVISIONING_ACTIONS = {action.value: action for action in ProvisioningAction}
+_LEARNING_PATH_REQUIRED_FIELDS = ('name', 'description', 'modules')
+_USER_REQUIRED_FIELDS = ('email',)
+
+# SSO endpoints and default claim mappings are the same for every organization
+_SSO_BASE_URL = "https://api.skillforge.ai/enterprise/sso"
+_SAML_ACS_URL = f"{_SSO_BASE_URL}/saml/acs"
+_SAML_SLS_URL = f"{_SSO_BASE_URL}/saml/sls"
+_OIDC_CALLBACK_URL = f"{_SSO_BASE_URL}/oidc/callback"
+_SAML_ATTRIBUTE_MAPPING = {
+    'email': 'http://schemas.xmlsoap.org/ws/2005/05/identity/claims/emailaddress',
+    'first_name': 'http://schemas.xmlsoap.org/ws/2005/05/identity/claims/givenname',
+    'last_name': 'http://schemas.xmlsoap.org/ws/2005/05/identity/claims/surname',
+    'groups': 'http://schemas.microsoft.com/ws/2008/06/identity/claims/groups'
+}
+_OIDC_ATTRIBUTE_MAPPING = {
+    'email': 'email',
+    'first_name': 'given_name',
+    'last_name': 'family_name',
+    'groups': 'groups'
+}
+_OIDC_DEFAULT_SCOPES = ('openid', 'profile', 'email')
+
 @dataclass
 class EnterpriseConfig:
     """Enterprise configuration settings"""
@@ -190,13 +212,13 @@ class EnterpriseIntegrationAPI:
         
         # Create SAML configuration
         saml_config = {
-            'entityid': f"https://api.skillforge.ai/enterprise/sso/saml/{organization_id}",
+            'entityid': f"{_SSO_BASE_URL}/saml/{organization_id}",
             'assertion_consumer_service': {
-                'url': f"https://api.skillforge.ai/enterprise/sso/saml/acs",
+                'url': _SAML_ACS_URL,
                 'binding': 'urn:oasis:names:tc:SAML:2.0:bindings:HTTP-POST'
             },
             'single_logout_service': {
-                'url': f"https://api.skillforge.ai/enterprise/sso/saml/sls",
+                'url': _SAML_SLS_URL,
                 'binding': 'urn:oasis:names:tc:SAML:2.0:bindings:HTTP-Redirect'
             },
             'idp': {
@@ -205,12 +227,7 @@ class EnterpriseIntegrationAPI:
                 'slo_url': config.get('idp_slo_url'),
                 'x509cert': config['idp_certificate']
             },
-            'attribute_mapping': config.get('attribute_mapping', {
-                'email': 'http://schemas.xmlsoap.org/ws/2005/05/identity/claims/emailaddress',
-                'first_name': 'http://schemas.xmlsoap.org/ws/2005/05/identity/claims/givenname',
-                'last_name': 'http://schemas.xmlsoap.org/ws/2005/05/identity/claims/surname',
-                'groups': 'http://schemas.microsoft.com/ws/2008/06/identity/claims/groups'
-            })
+            'attribute_mapping': config['attribute_mapping'] if 'attribute_mapping' in config else dict(_SAML_ATTRIBUTE_MAPPING)
         }
         
         # Create SAML client
@@ -218,6 +235,9 @@ class EnterpriseIntegrationAPI:
         saml2_config.load(saml_config)
         saml_client = Saml2Client(config=saml2_config)
         
+        # Reject a malformed IdP certificate at configuration time rather than at first login
+        self._load_idp_certificate(config['idp_certificate'])
+        
         # Store configuration
         self.sso_configs[organization_id] = {
             'type': IntegrationType.SAML,
@@ -231,10 +251,17 @@ class EnterpriseIntegrationAPI:
         return {
             'status': 'configured',
             'type': 'saml',
-            'metadata_url': f"https://api.skillforge.ai/enterprise/sso/saml/metadata?org={organization_id}",
-            'acs_url': f"https://api.skillforge.ai/enterprise/sso/saml/acs"
+            'metadata_url': f"{_SSO_BASE_URL}/saml/metadata?org={organization_id}",
+            'acs_url': _SAML_ACS_URL
         }
     
+    @staticmethod
+    def _load_idp_certificate(certificate: str):
+        """Parse an IdP certificate given as PEM or as a bare base64 body"""
+        if not certificate.lstrip().startswith("-----BEGIN"):
+            certificate = f"-----BEGIN CERTIFICATE-----\n{certificate.strip()}\n-----END CERTIFICATE-----"
+        return load_pem_x509_certificate(certificate.encode(), default_backend())
+    
     async def _configure_oidc_sso(
         self,
         organization_id: str,
@@ -247,20 +274,15 @@ class EnterpriseIntegrationAPI:
         oidc_client = OAuth2Session(
             client_id=config['client_id'],
             client_secret=config['client_secret'],
-            redirect_uri=f"https://api.skillforge.ai/enterprise/sso/oidc/callback"
+            redirect_uri=_OIDC_CALLBACK_URL
         )
         
         oidc_config = {
             'client_id': config['client_id'],
             'client_secret': config['client_secret'],
             'discovery_url': config['discovery_url'],
-            'scopes': config.get('scopes', ['openid', 'profile', 'email']),
-            'attribute_mapping': config.get('attribute_mapping', {
-                'email': 'email',
-                'first_name': 'given_name',
-                'last_name': 'family_name',
-                'groups': 'groups'
-            })
+            'scopes': config['scopes'] if 'scopes' in config else list(_OIDC_DEFAULT_SCOPES),
+            'attribute_mapping': config['attribute_mapping'] if 'attribute_mapping' in config else dict(_OIDC_ATTRIBUTE_MAPPING)
         }
         
         # Store configuration
@@ -276,8 +298,8 @@ class EnterpriseIntegrationAPI:
         return {
             'status': 'configured',
             'type': 'oidc',
-            'authorization_url': f"https://api.skillforge.ai/enterprise/sso/oidc/authorize?org={organization_id}",
-            'callback_url': f"https://api.skillforge.ai/enterprise/sso/oidc/callback"
+            'authorization_url': f"{_SSO_BASE_URL}/oidc/authorize?org={organization_id}",
+            'callback_url': _OIDC_CALLBACK_URL
         }
     
     async def bulk_user_operations(
@@ -294,14 +316,67 @@ class EnterpriseIntegrationAPI:
             'total': len(operations)
         }
         
+        # Consecutive creates are inserted together; the run is flushed before any other
+        # action so operations still apply in the order given. Each user gets its own
+        # outcome, so one bad row does not fail the rest of the run
+        pending_creates = []
+        
+        async def flush_creates():
+            if not pending_creates:
+                return
+            try:
+                outcomes = await self._create_enterprise_users(pending_creates, organization_id, db)
+            except Exception as e:
+                logger.error(f"Failed to create users in bulk: {e}")
+                outcomes = [e] * len(pending_creates)
+            
+            for user_data, outcome in zip(pending_creates, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Failed to process user operation: {outcome}")
+                    results['failed'].append({
+                        'user_data': user_data,
+                        'action': ProvisioningAction.CREATE.value,
+                        'error': str(outcome)
+                    })
+                else:
+                    results['successful'].append({
+                        'user_id': user_data.get('id'),
+                        'email': user_data['email'],
+                        'action': ProvisioningAction.CREATE.value,
+                        'result': outcome
+                    })
+            pending_creates.clear()
+        
         for operation in operations:
+            user_data = operation.get('user_data')
+            action = _PROVISIONING_ACTIONS.get(operation.get('action'))
+            if action is None:
+                results['failed'].append({
+                    'user_data': user_data,
+                    'action': operation.get('action'),
+                    'error': f"Unsupported action: {operation.get('action')}"
+                })
+                continue
+            
+            if action == ProvisioningAction.CREATE:
+                missing_fields = [
+                    field for field in _USER_REQUIRED_FIELDS
+                    if not isinstance(user_data, dict) or field not in user_data
+                ]
+                if missing_fields:
+                    results['failed'].append({
+                        'user_data': user_data,
+                        'action': action.value,
+                        'error': f"Missing required fields: {', '.join(missing_fields)}"
+                    })
+                else:
+                    pending_creates.append(user_data)
+                continue
+            
+            await flush_creates()
+            
             try:
-                action = ProvisioningAction(operation['action'])
-                user_data = operation['user_data']
-                
-                if action == ProvisioningAction.CREATE:
-                    result = await self._create_enterprise_user(user_data, organization_id, db)
-                elif action == ProvisioningAction.UPDATE:
+                if action == ProvisioningAction.UPDATE:
                     result = await self._update_enterprise_user(user_data, organization_id, db)
                 elif action == ProvisioningAction.DELETE:
                     result = await self._delete_enterprise_user(user_data['id'], organization_id, db)
@@ -321,10 +396,12 @@ class EnterpriseIntegrationAPI:
                 logger.error(f"Failed to process user operation: {e}")
                 results['failed'].append({
                     'user_data': user_data,
-                    'action': operation['action'],
+                    'action': action.value,
                     'error': str(e)
                 })
         
+        await flush_creates()
+        
         # Log bulk operation
         await self._log_audit_event(
             organization_id,
@@ -349,10 +426,9 @@ class EnterpriseIntegrationAPI:
         
         try:
             # Validate learning path structure
-            required_fields = ['name', 'description', 'modules']
-            for field in required_fields:
-                if field not in learning_path_data:
-                    raise ValueError(f"Missing required field: {field}")
+            missing_fields = [field for field in _LEARNING_PATH_REQUIRED_FIELDS if field not in learning_path_data]
+            if missing_fields:
+                raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
             
             # Create learning path
             learning_path = EnterpriseLearningPath(
@@ -408,8 +484,11 @@ class EnterpriseIntegrationAPI:
         """Get team overview for manager dashboard"""
         
         try:
-            # Get team members
-            team_members = db.query(EnterpriseUser).filter(
+            # Get team members; skills and learning paths load in two IN queries instead of two per member
+            team_members = db.query(EnterpriseUser).options(
+                selectinload(EnterpriseUser.skills),
+                selectinload(EnterpriseUser.learning_paths)
+            ).filter(
                 EnterpriseUser.organization_id == organization_id,
                 EnterpriseUser.manager_id == manager_id,
                 EnterpriseUser.is_active == True
@@ -417,8 +496,9 @@ class EnterpriseIntegrationAPI:
             
             # Calculate team metrics
             total_members = len(team_members)
-            active_learners = len([m for m in team_members if m.last_activity_date and 
-                                 m.last_activity_date > datetime.utcnow() - timedelta(days=7)])
+            active_since = datetime.utcnow() - timedelta(days=7)
+            active_learners = sum(1 for m in team_members
+                                  if m.last_activity_date and m.last_activity_date > active_since)
             
             # Get skill distribution
             skill_distribution = await self._calculate_team_skill_distribution(team_members, db)
@@ -502,10 +582,11 @@ class EnterpriseIntegrationAPI:
                 db
             )
             
+            generated_at = datetime.utcnow()
             return {
-                'report_id': f"report_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+                'report_id': f"report_{generated_at.strftime('%Y%m%d_%H%M%S')}",
                 'type': report_type,
-                'generated_at': datetime.utcnow().isoformat(),
+                'generated_at': generated_at.isoformat(),
                 'data': data,
                 'metadata': {
                     'total_records': len(data) if isinstance(data, list) else 1,
@@ -570,9 +651,15 @@ class EnterpriseIntegrationAPI:
         """Save SSO configuration to database"""
         pass
     
-    async def _create_enterprise_user(self, user_data: Dict[str, Any], organization_id: str, db: Session):
-        """Create enterprise user"""
-        pass
+    async def _create_enterprise_users(
+        self,
+        users_data: List[Dict[str, Any]],
+        organization_id: str,
+        db: Session
+    ) -> List[Union[Dict[str, Any], Exception]]:
+        """Create enterprise users in one batch, returning a result or the row's error per user"""
+        # Stub like the other user helpers until the enterprise user model exists
+        return [None] * len(users_data)
     
     async def _log_audit_event(self, organization_id: str, event_type: str, details: Dict[str, Any], db: Session):
         """Log audit event"""
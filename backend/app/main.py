@@ -26,6 +26,7 @@ from sentry_sdk.integrations.sqlalchemy import SqlAlchemyIntegration
 
 from app.core.config import settings
 from app.core.database import engine, get_db
+from app.core.storage import s3_manager
 from app.core.logging import setup_logging
 from app.core.exceptions import (
     ValidationException, AuthenticationException, AuthorizationException,
@@ -96,6 +97,9 @@ async def lifespan(app: FastAPI):
     if redis_client:
         await redis_client.close()
 
+    # Close the pooled S3 client
+    await s3_manager.close()
+
     logger.info("SkillForge AI application shutdown complete")
 
 # Create FastAPI application
@@ -2,7 +2,7 @@
 User SQLAlchemy models for SkillForge AI
 """
 
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, ForeignKey, Enum
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, ForeignKey, Enum, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -196,6 +196,12 @@ class UserSession(Base):
     # Relationships
     user = relationship("User")
     
+    # Indexes
+    __table_args__ = (
+        # DAU/MAU counts range over created_at and count distinct user_id straight from the index
+        Index("ix_user_sessions_created_at_user_id", "created_at", "user_id"),
+    )
+    
     def __repr__(self):
         return f"<UserSession(user_id={self.user_id}, active={self.is_active}, expires={self.expires_at})>"
     
@@ -12,11 +12,94 @@ import torch
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import json
+import operator
+import os
 import re
 from datetime import datetime
 
+from app.core.config import settings
+
+# Optional ONNX Runtime backend for sentence embeddings
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    ONNX_RUNTIME_AVAILABLE = True
+except ImportError:
+    ONNX_RUNTIME_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Keep intra-op threads on physical cores so concurrent workers don't oversubscribe the CPU
+torch.set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+try:
+    torch.set_num_interop_threads(1)
+except RuntimeError:
+    # Inter-op pool already started by another import
+    pass
+
+# Heavy pipelines loaded on first use rather than at service start
+LAZY_PIPELINES = {
+    'ner': {
+        'task': 'ner',
+        'model': 'dbmdz/bert-large-cased-finetuned-conll03-english',
+        'aggregation_strategy': 'simple'
+    },
+    'summarizer': {
+        'task': 'summarization',
+        'model': 'facebook/bart-large-cnn'
+    }
+}
+
+# Sentence embedding model and its input limit in tokens (sentence-transformers'
+# max_seq_length for MiniLM); the ONNX path truncates at the same point
+EMBEDDING_MODEL_NAME = 'all-MiniLM-L6-v2'
+EMBEDDING_MAX_SEQ_LENGTH = 256
+
+# Summarizer input bounds, in tokens
+SUMMARY_MIN_LENGTH = 30
+SUMMARY_MAX_INPUT_TOKENS = 1000
+
+# Keyword sentiment fallback, matched in a single pass
+_SENTIMENT_WORD_RE = re.compile(
+    r'\b(?:(?P<positive>good|great|excellent|amazing|love|best)'
+    r'|(?P<negative>bad|terrible|awful|hate|worst|horrible))\b',
+    re.IGNORECASE
+)
+
+# Common resume section headers
+SECTION_PATTERNS = {
+    'summary': r'(summary|profile|objective|about)',
+    'experience': r'(experience|employment|work history|professional experience)',
+    'education': r'(education|academic|qualifications)',
+    'skills': r'(skills|technical skills|competencies)',
+    'projects': r'(projects|portfolio)',
+    'certifications': r'(certifications|certificates|licenses)'
+}
+
+DEGREE_PATTERNS = [
+    r'(bachelor|master|phd|doctorate|associate|diploma)',
+    r'(b\.?s\.?|m\.?s\.?|m\.?a\.?|ph\.?d\.?|b\.?a\.?)'
+]
+
+DATE_PATTERNS = [
+    r'\d{4}\s*-\s*\d{4}',
+    r'\d{4}\s*-\s*present',
+    r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{4}',
+]
+
+# Precompiled resume parsing patterns
+_ALL_SECTIONS_RE = re.compile(
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern in SECTION_PATTERNS.items()),
+    re.IGNORECASE
+)
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_PHONE_RE = re.compile(r'(\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})')
+_LINKEDIN_RE = re.compile(r'linkedin\.com/in/[\w-]+', re.IGNORECASE)
+_GITHUB_RE = re.compile(r'github\.com/[\w-]+', re.IGNORECASE)
+_EXPERIENCE_SPLIT_RE = re.compile(r'\n\s*\n|\n(?=[A-Z][a-z]+ \d{4})')
+_EDUCATION_SPLIT_RE = re.compile(r'\n\s*\n|\n(?=[A-Z])')
+_DEGREE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in DEGREE_PATTERNS]
+_DATE_RES = [re.compile(pattern, re.IGNORECASE) for pattern in DATE_PATTERNS]
+
 
 class HuggingFaceService:
     """Service for HuggingFace model integration"""
@@ -26,6 +109,11 @@ class HuggingFaceService:
         self.tokenizers = {}
         self.pipelines = {}
         self.sentence_transformer = None
+        self.onnx_encoder = None
+        self.onnx_tokenizer = None
+        self._pipeline_locks = {name: asyncio.Lock() for name in LAZY_PIPELINES}
+        self._failed_pipelines = set()
+        self._lazy_loading_enabled = True
         self._initialize_models()
     
     def _initialize_models(self):
@@ -33,9 +121,12 @@ class HuggingFaceService:
         try:
             logger.info("Initializing HuggingFace models...")
             
-            # Initialize sentence transformer for embeddings
-            self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("Sentence transformer model loaded")
+            # Prefer ONNX Runtime for embeddings when an exported model is configured,
+            # otherwise initialize the sentence transformer
+            self._initialize_onnx_encoder()
+            if self.onnx_encoder is None:
+                self.sentence_transformer = SentenceTransformer(EMBEDDING_MODEL_NAME)
+                logger.info("Sentence transformer model loaded")
             
             # Initialize text classification pipeline for skill extraction
             self.pipelines['skill_classifier'] = pipeline(
@@ -45,21 +136,7 @@ class HuggingFaceService:
             )
             logger.info("Skill classification pipeline loaded")
             
-            # Initialize NER pipeline for entity extraction
-            self.pipelines['ner'] = pipeline(
-                "ner",
-                model="dbmdz/bert-large-cased-finetuned-conll03-english",
-                aggregation_strategy="simple"
-            )
-            logger.info("NER pipeline loaded")
-            
-            # Initialize summarization pipeline
-            self.pipelines['summarizer'] = pipeline(
-                "summarization",
-                model="facebook/bart-large-cnn"
-            )
-            logger.info("Summarization pipeline loaded")
-            
+            # NER and summarization pipelines are loaded on first use
             logger.info("All HuggingFace models initialized successfully")
             
         except Exception as e:
@@ -72,8 +149,12 @@ class HuggingFaceService:
         try:
             logger.info("Initializing minimal models for development...")
             
+            # Keep heavy pipelines out of development/testing mode
+            self._lazy_loading_enabled = False
+            
             # Use smaller, faster models for development
-            self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
+            if self.onnx_encoder is None:
+                self.sentence_transformer = SentenceTransformer(EMBEDDING_MODEL_NAME)
             
             # Simple text classification
             self.pipelines['sentiment'] = pipeline(
@@ -86,6 +167,71 @@ class HuggingFaceService:
         except Exception as e:
             logger.error(f"Error initializing minimal models: {e}")
     
+    def _initialize_onnx_encoder(self):
+        """Load the ONNX-exported sentence transformer, falling back to PyTorch on failure"""
+        model_path = settings.EMBEDDING_ONNX_MODEL_PATH
+        if not model_path or not ONNX_RUNTIME_AVAILABLE:
+            return
+        
+        try:
+            self.onnx_encoder = ORTModelForFeatureExtraction.from_pretrained(
+                model_path,
+                provider="CPUExecutionProvider"
+            )
+            self.onnx_tokenizer = AutoTokenizer.from_pretrained(model_path)
+            logger.info("ONNX Runtime embedding model loaded")
+        except Exception as e:
+            logger.warning(f"ONNX Runtime embedding model unavailable, using PyTorch: {e}")
+            self.onnx_encoder = None
+            self.onnx_tokenizer = None
+    
+    def _encode_onnx(self, texts: List[str]) -> np.ndarray:
+        """Encode texts with ONNX Runtime using mean pooling and L2 normalization"""
+        inputs = self.onnx_tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=EMBEDDING_MAX_SEQ_LENGTH,
+            return_tensors="np"
+        )
+        token_embeddings = self.onnx_encoder(**inputs).last_hidden_state
+        
+        # Mean-pool over real tokens only, matching sentence-transformers pooling
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.clip(norms, 1e-12, None)
+    
+    async def _get_lazy_pipeline(self, name: str):
+        """Return a lazily loaded pipeline, loading it off the event loop on first use"""
+        if name in self.pipelines:
+            return self.pipelines[name]
+        
+        if not self._lazy_loading_enabled or name in self._failed_pipelines:
+            return None
+        
+        async with self._pipeline_locks[name]:
+            if name not in self.pipelines and name not in self._failed_pipelines:
+                spec = dict(LAZY_PIPELINES[name])
+                try:
+                    logger.info(f"Loading {name} pipeline...")
+                    self.pipelines[name] = await asyncio.to_thread(pipeline, spec.pop('task'), **spec)
+                    logger.info(f"{name} pipeline loaded")
+                except Exception as e:
+                    logger.error(f"Error loading {name} pipeline: {e}")
+                    self._failed_pipelines.add(name)
+        
+        return self.pipelines.get(name)
+    
+    async def get_ner_pipeline(self):
+        """NER pipeline for entity extraction, or None if unavailable"""
+        return await self._get_lazy_pipeline('ner')
+    
+    async def get_summarizer_pipeline(self):
+        """Summarization pipeline, or None if unavailable"""
+        return await self._get_lazy_pipeline('summarizer')
+    
     async def extract_skills_from_text(self, text: str) -> List[Dict[str, Any]]:
         """
         Extract skills from text using NLP models
@@ -97,88 +243,129 @@ class HuggingFaceService:
             List of extracted skills with confidence scores
         """
         try:
-            skills = []
-            
-            # Predefined skill patterns (can be enhanced with ML models)
-            skill_patterns = {
-                'programming_languages': [
-                    'python', 'javascript', 'java', 'c++', 'c#', 'ruby', 'php', 'go', 'rust',
-                    'typescript', 'kotlin', 'swift', 'scala', 'r', 'matlab', 'sql'
-                ],
-                'frameworks': [
-                    'react', 'angular', 'vue', 'django', 'flask', 'fastapi', 'express',
-                    'spring', 'laravel', 'rails', 'nextjs', 'nuxt', 'svelte'
-                ],
-                'databases': [
-                    'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'cassandra',
-                    'dynamodb', 'sqlite', 'oracle', 'sql server'
-                ],
-                'cloud_platforms': [
-                    'aws', 'azure', 'gcp', 'google cloud', 'heroku', 'digitalocean',
-                    'kubernetes', 'docker', 'terraform'
-                ],
-                'tools': [
-                    'git', 'jenkins', 'docker', 'kubernetes', 'ansible', 'terraform',
-                    'jira', 'confluence', 'slack', 'figma', 'photoshop'
-                ],
-                'soft_skills': [
-                    'leadership', 'communication', 'teamwork', 'problem solving',
-                    'project management', 'agile', 'scrum', 'critical thinking'
-                ]
-            }
-            
-            text_lower = text.lower()
-            
-            # Extract skills using pattern matching
-            for category, skill_list in skill_patterns.items():
-                for skill in skill_list:
-                    if skill.lower() in text_lower:
-                        # Calculate confidence based on context
-                        confidence = self._calculate_skill_confidence(text, skill)
-                        
-                        skills.append({
-                            'skill': skill.title(),
-                            'category': category,
-                            'confidence': confidence,
-                            'source': 'pattern_matching',
-                            'context': self._extract_skill_context(text, skill)
-                        })
+            entities = []
             
             # Use NER to extract additional entities
-            if 'ner' in self.pipelines:
+            ner = await self.get_ner_pipeline()
+            if ner is not None:
                 try:
-                    entities = self.pipelines['ner'](text)
-                    for entity in entities:
-                        if entity['entity_group'] in ['ORG', 'MISC']:
-                            skills.append({
-                                'skill': entity['word'],
-                                'category': 'technology',
-                                'confidence': entity['score'],
-                                'source': 'ner_extraction',
-                                'context': text[max(0, entity['start']-50):entity['end']+50]
-                            })
+                    with torch.inference_mode():
+                        entities = ner(text)
                 except Exception as e:
                     logger.warning(f"NER extraction failed: {e}")
             
-            # Remove duplicates and sort by confidence
-            unique_skills = {}
-            for skill in skills:
-                key = skill['skill'].lower()
-                if key not in unique_skills or skill['confidence'] > unique_skills[key]['confidence']:
-                    unique_skills[key] = skill
-            
-            return sorted(unique_skills.values(), key=lambda x: x['confidence'], reverse=True)
+            return self._collect_skills(text, entities)
             
         except Exception as e:
             logger.error(f"Error extracting skills from text: {e}")
             return []
     
-    def _calculate_skill_confidence(self, text: str, skill: str) -> float:
-        """Calculate confidence score for skill extraction"""
+    async def extract_skills_from_texts(self, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """
+        Extract skills from several texts, batching the NER forward passes
+        
+        Args:
+            texts: Input texts (resumes, job descriptions, etc.)
+        
+        Returns:
+            One list of extracted skills per input text
+        """
+        entities_per_text = [[] for _ in texts]
+        
+        ner = await self.get_ner_pipeline() if texts else None
+        if ner is not None:
+            try:
+                with torch.inference_mode():
+                    entities_per_text = ner(texts, batch_size=8)
+            except Exception as e:
+                logger.warning(f"Batched NER extraction failed: {e}")
+        
+        results = []
+        for text, entities in zip(texts, entities_per_text):
+            try:
+                results.append(self._collect_skills(text, entities))
+            except Exception as e:
+                logger.error(f"Error extracting skills from text: {e}")
+                results.append([])
+        
+        return results
+    
+    def _collect_skills(self, text: str, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Combine pattern-matched skills with NER entities, keeping the best score per skill"""
+        skills = []
+        
+        # Predefined skill patterns (can be enhanced with ML models)
+        skill_patterns = {
+            'programming_languages': [
+                'python', 'javascript', 'java', 'c++', 'c#', 'ruby', 'php', 'go', 'rust',
+                'typescript', 'kotlin', 'swift', 'scala', 'r', 'matlab', 'sql'
+            ],
+            'frameworks': [
+                'react', 'angular', 'vue', 'django', 'flask', 'fastapi', 'express',
+                'spring', 'laravel', 'rails', 'nextjs', 'nuxt', 'svelte'
+            ],
+            'databases': [
+                'postgresql', 'mysql', 'mongodb', 'redis', 'elasticsearch', 'cassandra',
+                'dynamodb', 'sqlite', 'oracle', 'sql server'
+            ],
+            'cloud_platforms': [
+                'aws', 'azure', 'gcp', 'google cloud', 'heroku', 'digitalocean',
+                'kubernetes', 'docker', 'terraform'
+            ],
+            'tools': [
+                'git', 'jenkins', 'docker', 'kubernetes', 'ansible', 'terraform',
+                'jira', 'confluence', 'slack', 'figma', 'photoshop'
+            ],
+            'soft_skills': [
+                'leadership', 'communication', 'teamwork', 'problem solving',
+                'project management', 'agile', 'scrum', 'critical thinking'
+            ]
+        }
+        
+        text_lower = text.lower()
+        
+        # Extract skills using pattern matching
+        for category, skill_list in skill_patterns.items():
+            for skill in skill_list:
+                skill_lower = skill.lower()
+                pos = text_lower.find(skill_lower)
+                if pos != -1:
+                    # Calculate confidence based on context
+                    confidence = self._calculate_skill_confidence(text_lower, skill_lower)
+                    
+                    skills.append({
+                        'skill': skill.title(),
+                        'category': category,
+                        'confidence': confidence,
+                        'source': 'pattern_matching',
+                        # 50 characters of context either side of the first mention
+                        'context': text[max(0, pos - 50):pos + len(skill_lower) + 50].strip()
+                    })
+        
+        # Merge NER entities
+        for entity in entities:
+            if entity['entity_group'] in ['ORG', 'MISC']:
+                skills.append({
+                    'skill': entity['word'],
+                    'category': 'technology',
+                    'confidence': entity['score'],
+                    'source': 'ner_extraction',
+                    'context': text[max(0, entity['start']-50):entity['end']+50]
+                })
+        
+        # Remove duplicates and sort by confidence
+        unique_skills = {}
+        for skill in skills:
+            key = skill['skill'].lower()
+            current = unique_skills.get(key)
+            if current is None or skill['confidence'] > current['confidence']:
+                unique_skills[key] = skill
+        
+        return sorted(unique_skills.values(), key=operator.itemgetter('confidence'), reverse=True)
+    
+    def _calculate_skill_confidence(self, text_lower: str, skill_lower: str) -> float:
+        """Calculate confidence score for skill extraction (inputs already lowercased)"""
         try:
-            text_lower = text.lower()
-            skill_lower = skill.lower()
-            
             # Base confidence
             confidence = 0.5
             
@@ -208,27 +395,6 @@ class HuggingFaceService:
             logger.error(f"Error calculating skill confidence: {e}")
             return 0.5
     
-    def _extract_skill_context(self, text: str, skill: str) -> str:
-        """Extract context around skill mention"""
-        try:
-            text_lower = text.lower()
-            skill_lower = skill.lower()
-            
-            # Find skill position
-            pos = text_lower.find(skill_lower)
-            if pos == -1:
-                return ""
-            
-            # Extract context (50 characters before and after)
-            start = max(0, pos - 50)
-            end = min(len(text), pos + len(skill) + 50)
-            
-            return text[start:end].strip()
-            
-        except Exception as e:
-            logger.error(f"Error extracting skill context: {e}")
-            return ""
-    
     async def generate_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         Generate embeddings for text using sentence transformers
@@ -237,14 +403,32 @@ class HuggingFaceService:
             texts: List of texts to embed
         
         Returns:
-            Numpy array of embeddings
+            Numpy array of unit-length float16 embeddings
         """
         try:
-            if not self.sentence_transformer:
+            # Encode each distinct text once, then scatter back to input order
+            positions = {}
+            inverse = [positions.setdefault(text, len(positions)) for text in texts]
+            unique_texts = list(positions)
+            
+            if self.onnx_encoder is not None:
+                embeddings = self._encode_onnx(unique_texts)
+            elif self.sentence_transformer:
+                # Normalize at encode time so cosine similarity reduces to a dot product
+                embeddings = self.sentence_transformer.encode(
+                    unique_texts,
+                    batch_size=32,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True
+                )
+            else:
                 raise ValueError("Sentence transformer not initialized")
             
-            embeddings = self.sentence_transformer.encode(texts)
-            return embeddings
+            if len(unique_texts) != len(texts):
+                embeddings = embeddings[inverse]
+            
+            # MiniLM carries well under float16 precision; halve storage and transport bytes
+            return embeddings.astype(np.float16, copy=False)
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
@@ -266,17 +450,41 @@ class HuggingFaceService:
             if len(embeddings) != 2:
                 return 0.0
             
-            # Calculate cosine similarity
-            similarity = np.dot(embeddings[0], embeddings[1]) / (
-                np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-            )
-            
-            return float(similarity)
+            # Embeddings are unit-length, so cosine similarity is the dot product
+            embeddings = embeddings.astype(np.float32)
+            return float(np.dot(embeddings[0], embeddings[1]))
             
         except Exception as e:
             logger.error(f"Error calculating similarity: {e}")
             return 0.0
     
+    async def calculate_similarity_batch(self, query: str, docs: List[str]) -> np.ndarray:
+        """
+        Calculate semantic similarity between a query and many documents
+        
+        Args:
+            query: Query text (e.g. a resume)
+            docs: Texts to score against the query (e.g. job descriptions)
+        
+        Returns:
+            Array of similarity scores, one per document
+        """
+        try:
+            if not docs:
+                return np.array([], dtype=np.float32)
+            
+            embeddings = await self.generate_embeddings([query] + list(docs))
+            if len(embeddings) != len(docs) + 1:
+                return np.zeros(len(docs), dtype=np.float32)
+            
+            # Single matrix-vector product over all normalized document embeddings
+            embeddings = embeddings.astype(np.float32)
+            return embeddings[1:] @ embeddings[0]
+            
+        except Exception as e:
+            logger.error(f"Error calculating batch similarity: {e}")
+            return np.zeros(len(docs), dtype=np.float32)
+    
     async def summarize_text(self, text: str, max_length: int = 150) -> str:
         """
         Summarize text using HuggingFace summarization model
@@ -289,17 +497,24 @@ class HuggingFaceService:
             Summarized text
         """
         try:
-            if 'summarizer' not in self.pipelines:
+            summarizer = await self.get_summarizer_pipeline()
+            if summarizer is None:
                 # Fallback to simple truncation
                 return text[:max_length] + "..." if len(text) > max_length else text
             
+            # Too short to summarize; the text is its own summary
+            summary_input = self._prepare_summary_input(summarizer.tokenizer, text)
+            if summary_input is None:
+                return text
+            
             # Use HuggingFace summarization
-            summary = self.pipelines['summarizer'](
-                text,
-                max_length=max_length,
-                min_length=30,
-                do_sample=False
-            )
+            with torch.inference_mode():
+                summary = summarizer(
+                    summary_input,
+                    max_length=max_length,
+                    min_length=SUMMARY_MIN_LENGTH,
+                    do_sample=False
+                )
             
             return summary[0]['summary_text']
             
@@ -308,6 +523,85 @@ class HuggingFaceService:
             # Fallback to simple truncation
             return text[:max_length] + "..." if len(text) > max_length else text
     
+    def _prepare_summary_input(self, tokenizer, text: str) -> Optional[str]:
+        """Return text ready for the summarizer, or None if it is too short to summarize"""
+        tokens = tokenizer.tokenize(text)
+        if len(tokens) < SUMMARY_MIN_LENGTH + 10:
+            return None
+        
+        # Stay under BART's 1024-token window instead of relying on truncation
+        if len(tokens) > SUMMARY_MAX_INPUT_TOKENS:
+            return tokenizer.convert_tokens_to_string(tokens[:SUMMARY_MAX_INPUT_TOKENS])
+        
+        return text
+    
+    async def summarize_texts(self, texts: List[str], max_length: int = 150) -> List[str]:
+        """
+        Summarize several texts in one batched summarization call
+        
+        Args:
+            texts: Texts to summarize
+            max_length: Maximum length of each summary
+        
+        Returns:
+            One summary per input text
+        """
+        try:
+            summarizer = await self.get_summarizer_pipeline() if texts else None
+            if summarizer is None:
+                return [text[:max_length] + "..." if len(text) > max_length else text for text in texts]
+            
+            # Only send texts long enough to benefit from summarization
+            results = list(texts)
+            pending = []
+            for index, text in enumerate(texts):
+                summary_input = self._prepare_summary_input(summarizer.tokenizer, text)
+                if summary_input is not None:
+                    pending.append((index, summary_input))
+            
+            if pending:
+                with torch.inference_mode():
+                    summaries = summarizer(
+                        [summary_input for _, summary_input in pending],
+                        batch_size=8,
+                        max_length=max_length,
+                        min_length=SUMMARY_MIN_LENGTH,
+                        do_sample=False,
+                        truncation=True
+                    )
+                for (index, _), summary in zip(pending, summaries):
+                    results[index] = summary['summary_text']
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error summarizing texts: {e}")
+            return [text[:max_length] + "..." if len(text) > max_length else text for text in texts]
+    
+    async def analyze_sentiments(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze sentiment of several texts in one batched pipeline call
+        
+        Args:
+            texts: Texts to analyze
+        
+        Returns:
+            One sentiment analysis result per input text
+        """
+        if 'sentiment' in self.pipelines and texts:
+            try:
+                with torch.inference_mode():
+                    results = self.pipelines['sentiment'](texts, batch_size=8, truncation=True)
+                timestamp = datetime.utcnow().isoformat()
+                return [
+                    {'label': result['label'], 'score': result['score'], 'timestamp': timestamp}
+                    for result in results
+                ]
+            except Exception as e:
+                logger.error(f"Error analyzing sentiments: {e}")
+        
+        return [await self.analyze_sentiment(text) for text in texts]
+    
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyze sentiment of text
@@ -320,7 +614,8 @@ class HuggingFaceService:
         """
         try:
             if 'sentiment' in self.pipelines:
-                result = self.pipelines['sentiment'](text)
+                with torch.inference_mode():
+                    result = self.pipelines['sentiment'](text)
                 return {
                     'label': result[0]['label'],
                     'score': result[0]['score'],
@@ -328,12 +623,13 @@ class HuggingFaceService:
                 }
             else:
                 # Fallback to simple keyword-based sentiment
-                positive_words = ['good', 'great', 'excellent', 'amazing', 'love', 'best']
-                negative_words = ['bad', 'terrible', 'awful', 'hate', 'worst', 'horrible']
-                
-                text_lower = text.lower()
-                positive_count = sum(1 for word in positive_words if word in text_lower)
-                negative_count = sum(1 for word in negative_words if word in text_lower)
+                positive_count = 0
+                negative_count = 0
+                for match in _SENTIMENT_WORD_RE.finditer(text):
+                    if match.lastgroup == 'positive':
+                        positive_count += 1
+                    else:
+                        negative_count += 1
                 
                 if positive_count > negative_count:
                     return {'label': 'POSITIVE', 'score': 0.7, 'timestamp': datetime.utcnow().isoformat()}
@@ -352,7 +648,7 @@ class HuggingFaceService:
             status = {
                 'status': 'healthy',
                 'models_loaded': len(self.pipelines),
-                'sentence_transformer': self.sentence_transformer is not None,
+                'sentence_transformer': self.sentence_transformer is not None or self.onnx_encoder is not None,
                 'available_services': list(self.pipelines.keys()),
                 'timestamp': datetime.utcnow().isoformat()
             }
@@ -412,22 +708,9 @@ class ResumeParsingService:
             # Analyze sentiment/tone
             sentiment = await self.ai_service.analyze_sentiment(resume_text)
 
-            parsed_resume = {
-                'contact_info': contact_info,
-                'summary': summary,
-                'skills': skills,
-                'experience': experience,
-                'education': education,
-                'sections': sections,
-                'sentiment_analysis': sentiment,
-                'parsing_metadata': {
-                    'parsed_at': datetime.utcnow().isoformat(),
-                    'text_length': len(resume_text),
-                    'skills_found': len(skills),
-                    'experience_entries': len(experience),
-                    'education_entries': len(education)
-                }
-            }
+            parsed_resume = self._build_parsed_resume(
+                resume_text, sections, skills, contact_info, experience, education, summary, sentiment
+            )
 
             logger.info(f"Resume parsed successfully: {len(skills)} skills found")
             return parsed_resume
@@ -439,43 +722,113 @@ class ResumeParsingService:
                 'parsed_at': datetime.utcnow().isoformat()
             }
 
-    def _extract_resume_sections(self, text: str) -> Dict[str, str]:
-        """Extract main sections from resume text"""
+    async def parse_resumes_batch(self, resume_texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Parse several resumes, batching the model calls across documents
+
+        Args:
+            resume_texts: Raw resume texts
+
+        Returns:
+            Structured resume data, one entry per input text
+        """
         try:
-            sections = {}
+            logger.info(f"Parsing batch of {len(resume_texts)} resumes...")
+
+            # Run each model once over the whole batch
+            skills_per_resume = await self.ai_service.extract_skills_from_texts(resume_texts)
+            summaries = await self.ai_service.summarize_texts(resume_texts, max_length=200)
+            sentiments = await self.ai_service.analyze_sentiments(resume_texts)
+
+            parsed_resumes = []
+            for resume_text, skills, summary, sentiment in zip(
+                resume_texts, skills_per_resume, summaries, sentiments
+            ):
+                sections = self._extract_resume_sections(resume_text)
+                parsed_resumes.append(self._build_parsed_resume(
+                    resume_text,
+                    sections,
+                    skills,
+                    self._extract_contact_info(resume_text),
+                    self._extract_experience(sections.get('experience', '')),
+                    self._extract_education(sections.get('education', '')),
+                    summary,
+                    sentiment
+                ))
+
+            logger.info(f"Resume batch parsed successfully: {len(parsed_resumes)} resumes")
+            return parsed_resumes
 
-            # Common section headers
-            section_patterns = {
-                'summary': r'(summary|profile|objective|about)',
-                'experience': r'(experience|employment|work history|professional experience)',
-                'education': r'(education|academic|qualifications)',
-                'skills': r'(skills|technical skills|competencies)',
-                'projects': r'(projects|portfolio)',
-                'certifications': r'(certifications|certificates|licenses)'
+        except Exception as e:
+            logger.error(f"Error parsing resume batch: {e}")
+            parsed_at = datetime.utcnow().isoformat()
+            return [{'error': str(e), 'parsed_at': parsed_at} for _ in resume_texts]
+
+    def _build_parsed_resume(
+        self,
+        resume_text: str,
+        sections: Dict[str, str],
+        skills: List[Dict[str, Any]],
+        contact_info: Dict[str, str],
+        experience: List[Dict[str, Any]],
+        education: List[Dict[str, Any]],
+        summary: str,
+        sentiment: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Assemble the structured resume payload"""
+        return {
+            'contact_info': contact_info,
+            'summary': summary,
+            'skills': skills,
+            'experience': experience,
+            'education': education,
+            'sections': sections,
+            'sentiment_analysis': sentiment,
+            'parsing_metadata': {
+                'parsed_at': datetime.utcnow().isoformat(),
+                'text_length': len(resume_text),
+                'skills_found': len(skills),
+                'experience_entries': len(experience),
+                'education_entries': len(education)
             }
+        }
 
-            text_lower = text.lower()
-
-            for section_name, pattern in section_patterns.items():
-                # Find section start
-                import re
-                match = re.search(pattern, text_lower)
-                if match:
-                    start_pos = match.start()
+    def _extract_resume_sections(self, text: str) -> Dict[str, str]:
+        """Extract main sections from resume text"""
+        try:
+            sections = {}
 
-                    # Find next section or end of text
-                    next_section_pos = len(text)
-                    for other_pattern in section_patterns.values():
-                        if other_pattern != pattern:
-                            next_match = re.search(other_pattern, text_lower[start_pos + 50:])
-                            if next_match:
-                                next_section_pos = min(next_section_pos, start_pos + 50 + next_match.start())
+            # Locate every section header in a single scan
+            headers = [
+                (match.start(), match.end(), match.lastgroup) for match in _ALL_SECTIONS_RE.finditer(text)
+            ]
 
-                    # Extract section content
-                    section_content = text[start_pos:next_section_pos].strip()
-                    sections[section_name] = section_content
+            for index, (start_pos, _, section_name) in enumerate(headers):
+                if section_name in sections:
+                    continue
 
-            return sections
+                # Section runs until the next different header starting at least 50 chars on
+                search_pos = start_pos + 50
+                next_section_pos = len(text)
+                for next_pos, next_end, next_name in headers[index + 1:]:
+                    if next_end <= search_pos:
+                        continue
+                    if next_pos < search_pos:
+                        # A header straddles the cut-off and may hide one inside it
+                        # ("professional experience"), so search again from the cut-off
+                        for match in _ALL_SECTIONS_RE.finditer(text, search_pos):
+                            if match.lastgroup != section_name:
+                                next_section_pos = match.start()
+                                break
+                        break
+                    if next_name != section_name:
+                        next_section_pos = next_pos
+                        break
+
+                # Extract section content
+                sections[section_name] = text[start_pos:next_section_pos].strip()
+
+            return {name: sections[name] for name in SECTION_PATTERNS if name in sections}
 
         except Exception as e:
             logger.error(f"Error extracting resume sections: {e}")
@@ -487,26 +840,22 @@ class ResumeParsingService:
             contact_info = {}
 
             # Email pattern
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            email_match = re.search(email_pattern, text)
+            email_match = _EMAIL_RE.search(text)
             if email_match:
                 contact_info['email'] = email_match.group()
 
             # Phone pattern
-            phone_pattern = r'(\+?1[-.\s]?)?\(?([0-9]{3})\)?[-.\s]?([0-9]{3})[-.\s]?([0-9]{4})'
-            phone_match = re.search(phone_pattern, text)
+            phone_match = _PHONE_RE.search(text)
             if phone_match:
                 contact_info['phone'] = phone_match.group()
 
             # LinkedIn pattern
-            linkedin_pattern = r'linkedin\.com/in/[\w-]+'
-            linkedin_match = re.search(linkedin_pattern, text, re.IGNORECASE)
+            linkedin_match = _LINKEDIN_RE.search(text)
             if linkedin_match:
                 contact_info['linkedin'] = linkedin_match.group()
 
             # GitHub pattern
-            github_pattern = r'github\.com/[\w-]+'
-            github_match = re.search(github_pattern, text, re.IGNORECASE)
+            github_match = _GITHUB_RE.search(text)
             if github_match:
                 contact_info['github'] = github_match.group()
 
@@ -522,9 +871,7 @@ class ResumeParsingService:
             experiences = []
 
             # Split by common delimiters
-            entries = re.split(r'\n\s*\n|\n(?=[A-Z][a-z]+ \d{4})', experience_text)
-
-            for entry in entries:
+            for entry in self._iter_entries(_EXPERIENCE_SPLIT_RE, experience_text):
                 if len(entry.strip()) < 20:  # Skip short entries
                     continue
 
@@ -550,9 +897,7 @@ class ResumeParsingService:
             education_entries = []
 
             # Split by common delimiters
-            entries = re.split(r'\n\s*\n|\n(?=[A-Z])', education_text)
-
-            for entry in entries:
+            for entry in self._iter_entries(_EDUCATION_SPLIT_RE, education_text):
                 if len(entry.strip()) < 10:  # Skip short entries
                     continue
 
@@ -572,6 +917,14 @@ class ResumeParsingService:
             logger.error(f"Error extracting education: {e}")
             return []
 
+    def _iter_entries(self, delimiter_re: re.Pattern, text: str):
+        """Yield the slices of text between delimiter matches without building a split list"""
+        start = 0
+        for match in delimiter_re.finditer(text):
+            yield text[start:match.start()]
+            start = match.end()
+        yield text[start:]
+
     def _extract_company_name(self, text: str) -> str:
         """Extract company name from experience entry"""
         # Simple heuristic: first line often contains company name
@@ -598,13 +951,8 @@ class ResumeParsingService:
 
     def _extract_degree(self, text: str) -> str:
         """Extract degree from education entry"""
-        degree_patterns = [
-            r'(bachelor|master|phd|doctorate|associate|diploma)',
-            r'(b\.?s\.?|m\.?s\.?|m\.?a\.?|ph\.?d\.?|b\.?a\.?)'
-        ]
-
-        for pattern in degree_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for degree_re in _DEGREE_RES:
+            match = degree_re.search(text)
             if match:
                 return match.group()
 
@@ -613,14 +961,8 @@ class ResumeParsingService:
     def _extract_dates(self, text: str) -> str:
         """Extract date ranges from text"""
         # Look for date patterns
-        date_patterns = [
-            r'\d{4}\s*-\s*\d{4}',
-            r'\d{4}\s*-\s*present',
-            r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\s+\d{4}',
-        ]
-
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for date_re in _DATE_RES:
+            match = date_re.search(text)
             if match:
                 return match.group()
 
@@ -4,10 +4,12 @@ Advanced text-to-speech system using Microsoft SpeechT5 for personalized audio l
 """
 
 import asyncio
+import io
 import logging
 import re
 import json
 import hashlib
+from collections import Counter
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -16,30 +18,198 @@ from transformers import SpeechT5Processor, SpeechT5ForTextToSpeech, SpeechT5Hif
 from datasets import load_dataset
 import soundfile as sf
 import numpy as np
-from pydub import AudioSegment
-from pydub.effects import normalize, compress_dynamic_range
-import boto3
+from cachetools import LRUCache
+import librosa
+from scipy.signal import butter, sosfilt
 from botocore.exceptions import ClientError
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import intel_extension_for_pytorch as ipex
+    IPEX_AVAILABLE = True
+except ImportError:
+    IPEX_AVAILABLE = False
+
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.storage import s3_manager
 from app.models.learning import LearningContent, AudioContent, AudioChapter
 from app.utils.cache import cache_manager
 from app.utils.text_processing import TextProcessor
 
 logger = logging.getLogger(__name__)
 
+# Output sample rate for generated audio
+SAMPLE_RATE = 22050
+
+# Post-processing levels
+NORMALIZE_HEADROOM_DB = 0.1
+COMPRESSOR_THRESHOLD_DB = -20.0
+COMPRESSOR_RATIO = 4.0
+
+# Voice-style EQ filters, designed once as float32 second-order sections so
+# filtering float32 audio stays in float32
+_TECHNICAL_EQ_SOS = butter(4, [100, 8000], btype='band', fs=SAMPLE_RATE, output='sos').astype(np.float32)
+_FRIENDLY_EQ_SOS = butter(4, 7000, btype='low', fs=SAMPLE_RATE, output='sos').astype(np.float32)
+
+# Text preprocessing is voice-independent, so its results are cached for longer
+TEXT_CACHE_TTL = 7 * 24 * 3600  # 7 days
+TEXT_CACHE_MAX_SIZE = 1024  # in-process entries in front of the shared cache
+
+# Decoded mel spectrograms, shared across workers as float16 bytes
+MEL_CACHE_TTL = 24 * 3600  # 1 day
+
+# Number of sentences in the extractive audio summary
+SUMMARY_SENTENCES = 3
+
+# CMU ARCTIC x-vector rows used for each voice style's speaker_id (0-3)
+SPEAKER_XVECTOR_INDICES = (0, 7306, 4000, 1000)
+
+# Maximum number of texts synthesized per SpeechT5 forward pass
+SYNTHESIS_BATCH_SIZE = 8
+
+# CUDA streams that concurrent synthesis batches are spread across; this also
+# caps how many batches run at once
+CUDA_STREAM_POOL_SIZE = 4
+
+# Transition words that get a short pause before them
+TRANSITION_WORDS = ['however', 'therefore', 'furthermore', 'additionally', 'consequently']
+
+# Texts at least this long are scanned for emphasis spans with the JIT scanner
+EMPHASIS_SCAN_MIN_LENGTH = 2000
+
+# Emphasis span kinds reported by _find_emphasis_spans
+EMPHASIS_MODERATE = 0
+EMPHASIS_STRONG = 1
+EMPHASIS_LEVELS = ('moderate', 'strong')
+
+
+def _is_word_char(char: str) -> bool:
+    """Match the regex \\w class for a single character"""
+    return char == '_' or char.isalnum()
+
+
+def _find_emphasis_spans(text: str) -> np.ndarray:
+    """Find camelCase, snake_case and number spans in one pass, as (start, end, kind) rows"""
+    
+    n = len(text)
+    spans = np.empty((n // 2 + 1, 3), dtype=np.int64)
+    count = 0
+    i = 0
+    
+    while i < n:
+        if not _is_word_char(text[i]):
+            i += 1
+            continue
+        
+        # Walk the whole word and classify it
+        j = i
+        letters_only = True
+        snake_chars_only = True
+        decimal_only = True
+        has_upper = False
+        first_underscore = -1
+        while j < n and _is_word_char(text[j]):
+            code = ord(text[j])
+            is_lower = 97 <= code <= 122
+            is_upper = 65 <= code <= 90
+            if is_upper:
+                has_upper = True
+            if not (is_lower or is_upper):
+                letters_only = False
+            if not (is_lower or code == 95):
+                snake_chars_only = False
+            if code == 95 and first_underscore < 0:
+                first_underscore = j - i
+            if not text[j].isdecimal():
+                decimal_only = False
+            j += 1
+        
+        first_lower = 97 <= ord(text[i]) <= 122
+        
+        # [a-z]+[A-Z][a-zA-Z]* or [a-z]+_[a-z_]+
+        if first_lower and ((letters_only and has_upper) or
+                            (snake_chars_only and 0 < first_underscore < j - i - 1)):
+            # A percent sign only joins a number when the next word stays plain
+            if count and spans[count - 1, 2] == EMPHASIS_STRONG and spans[count - 1, 1] == i:
+                spans[count - 1, 1] -= 1
+            spans[count, 0] = i
+            spans[count, 1] = j
+            spans[count, 2] = EMPHASIS_MODERATE
+            count += 1
+            i = j
+            continue
+        
+        # \d+(?:\.\d+)?%? bounded by word boundaries
+        if decimal_only:
+            end = j
+            if j + 1 < n and text[j] == '.' and text[j + 1].isdecimal():
+                k = j + 1
+                while k < n and text[k].isdecimal():
+                    k += 1
+                if k == n or not _is_word_char(text[k]):
+                    end = k
+            if end + 1 < n and text[end] == '%' and _is_word_char(text[end + 1]):
+                end += 1
+            spans[count, 0] = i
+            spans[count, 1] = end
+            spans[count, 2] = EMPHASIS_STRONG
+            count += 1
+            i = end
+            continue
+        
+        i = j
+    
+    return spans[:count]
+
+
+if NUMBA_AVAILABLE:
+    _is_word_char = numba.njit(cache=True)(_is_word_char)
+    _find_emphasis_spans = numba.njit(cache=True)(_find_emphasis_spans)
+
+
 class AudioLearningService:
     """Advanced audio learning content generation with Microsoft SpeechT5"""
     
+    # Text preprocessing patterns, compiled once at class load
+    _SENT_PAUSE_RE = re.compile(r'\.(\s+)')
+    _COMMA_PAUSE_RE = re.compile(r',(\s+)')
+    _COLON_PAUSE_RE = re.compile(r':(\s+)')
+    _TRANSITION_RE = re.compile(r'\b(' + '|'.join(TRANSITION_WORDS) + r')\b', re.IGNORECASE)
+    _QUOTE_RE = re.compile(r'"([^"]+)"')
+    _CAMEL_CASE_RE = re.compile(r'\b([a-z]+[A-Z][a-zA-Z]*)\b')
+    _SNAKE_CASE_RE = re.compile(r'\b([a-z]+_[a-z_]+)\b')
+    _NUMBER_RE = re.compile(r'\b(\d+(?:\.\d+)?%?)\b')
+    _HEADER_RE = re.compile(r'^#{1,6}\s+(.+)$', re.MULTILINE)
+    _SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+    
+    # SpeechT5 has no SSML support; tags are stripped and breaks become silence.
+    # Quote emphasis can eat the quotes of a break tag, so they are optional here.
+    _EMPHASIS_TAG_RE = re.compile(r'</?emphasis[^>]*>')
+    _BREAK_TAG_RE = re.compile(r'<break\s+time="?([\d.]+)s"?\s*/>')
+    
     def __init__(self):
         self.processor = None
         self.model = None
         self.vocoder = None
         self.speaker_embeddings = None
-        self.s3_client = None
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.dtype = self._select_dtype()
+        self._cuda_streams = []
+        self._batch_slots = None  # queue of free stream slots, created with the models
         self.text_processor = TextProcessor()
-        self.audio_cache = {}
+        self._text_cache = LRUCache(maxsize=TEXT_CACHE_MAX_SIZE)
         
         # Voice configurations
         self.voice_configs = {
@@ -110,6 +280,24 @@ class AudioLearningService:
             'Figma': 'Fig-ma',
             'Sketch': 'Sketch'
         }
+        
+        # One case-insensitive alternation over every term, longest first so
+        # overlapping terms resolve to the most specific pronunciation
+        self._pronunciation_lookup = {term.lower(): spoken for term, spoken in self.pronunciation_dict.items()}
+        self._pronunciation_re = re.compile(
+            r'\b(' + '|'.join(
+                re.escape(term) for term in sorted(self.pronunciation_dict, key=len, reverse=True)
+            ) + r')\b',
+            re.IGNORECASE
+        )
+        
+        # Aho-Corasick automaton over lowercased terms when pyahocorasick is installed
+        self._pronunciation_automaton = None
+        if AHOCORASICK_AVAILABLE:
+            self._pronunciation_automaton = ahocorasick.Automaton()
+            for term_lower, spoken in self._pronunciation_lookup.items():
+                self._pronunciation_automaton.add_word(term_lower, (len(term_lower), spoken))
+            self._pronunciation_automaton.make_automaton()
     
     async def initialize_models(self):
         """Initialize SpeechT5 models and components"""
@@ -118,20 +306,38 @@ class AudioLearningService:
             
             # Load processor and model
             self.processor = SpeechT5Processor.from_pretrained("microsoft/speecht5_tts")
-            self.model = SpeechT5ForTextToSpeech.from_pretrained("microsoft/speecht5_tts")
-            self.vocoder = SpeechT5HifiGan.from_pretrained("microsoft/speecht5_hifigan")
+            self.model = SpeechT5ForTextToSpeech.from_pretrained("microsoft/speecht5_tts").to(
+                device=self.device, dtype=self.dtype
+            ).eval()
+            self.vocoder = SpeechT5HifiGan.from_pretrained("microsoft/speecht5_hifigan").to(
+                device=self.device, dtype=self.dtype
+            ).eval()
             
-            # Load speaker embeddings dataset
+            # Load one speaker embedding per speaker_id as a [4, 512] tensor kept on the model device
             embeddings_dataset = load_dataset("Matthijs/cmu-arctic-xvectors", split="validation")
-            self.speaker_embeddings = torch.tensor(embeddings_dataset[0]["xvector"]).unsqueeze(0)
-            
-            # Initialize S3 client for audio storage
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-                region_name=settings.AWS_REGION
-            )
+            self.speaker_embeddings = torch.stack([
+                torch.tensor(embeddings_dataset[index]["xvector"]) for index in SPEAKER_XVECTOR_INDICES
+            ]).to(device=self.device, dtype=self.dtype)
+            
+            # Separate streams let concurrent batches overlap their kernels on GPU
+            if self.device.type == "cuda":
+                self._cuda_streams = [torch.cuda.Stream() for _ in range(CUDA_STREAM_POOL_SIZE)]
+            
+            # CPU-only hosts are dispatch-bound; apply the configured CPU optimization
+            if self.device.type == "cpu" and settings.AUDIO_CPU_BACKEND != "torch":
+                self._optimize_for_cpu(settings.AUDIO_CPU_BACKEND)
+            
+            # Compile the autoregressive decoder and vocoder to cut per-step dispatch overhead
+            if settings.AUDIO_TORCH_COMPILE:
+                self._compile_models()
+            
+            # One slot per stream, each held by a single batch at a time. A CPU batch already
+            # uses every intra-op thread and CUDA graph replay is not thread-safe, so those
+            # run one batch at a time
+            slots = len(self._cuda_streams) if self._cuda_streams and not settings.AUDIO_TORCH_COMPILE else 1
+            self._batch_slots = asyncio.Queue()
+            for slot in range(slots):
+                self._batch_slots.put_nowait(slot)
             
             logger.info("SpeechT5 models initialized successfully")
             
@@ -139,6 +345,54 @@ class AudioLearningService:
             logger.error(f"Failed to initialize SpeechT5 models: {e}")
             raise
     
+    def _select_dtype(self) -> torch.dtype:
+        """Pick half precision on GPU (bfloat16 where supported), full precision on CPU"""
+        
+        if self.device.type != "cuda":
+            return torch.float32
+        
+        return torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+    
+    def _optimize_for_cpu(self, backend: str):
+        """Apply a CPU inference backend to the SpeechT5 model and vocoder"""
+        
+        if backend == "ipex":
+            if not IPEX_AVAILABLE:
+                logger.warning("AUDIO_CPU_BACKEND=ipex but intel_extension_for_pytorch is not installed")
+                return
+            
+            # oneDNN fused kernels with bfloat16 weights
+            self.dtype = torch.bfloat16
+            self.model = ipex.optimize(self.model, dtype=self.dtype)
+            self.vocoder = ipex.optimize(self.vocoder, dtype=self.dtype)
+            self.speaker_embeddings = self.speaker_embeddings.to(dtype=self.dtype)
+            logger.info("SpeechT5 optimized with Intel Extension for PyTorch")
+        elif backend == "int8":
+            # Dynamic int8 quantization of the decoder's linear layers, the hot loop of
+            # autoregressive generation; the vocoder stays full precision for audio quality
+            self.model.speecht5.decoder = torch.ao.quantization.quantize_dynamic(
+                self.model.speecht5.decoder,
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
+            logger.info("SpeechT5 decoder quantized to int8")
+        else:
+            logger.warning(f"Unknown AUDIO_CPU_BACKEND '{backend}', using plain PyTorch")
+    
+    def _compile_models(self):
+        """Compile the SpeechT5 decoder and vocoder and warm them up"""
+        
+        # CUDA graphs only pay off on GPU
+        mode = "reduce-overhead" if self.device.type == "cuda" else "default"
+        
+        decoder = self.model.speecht5.decoder
+        decoder.wrapped_decoder = torch.compile(decoder.wrapped_decoder, mode=mode, fullgraph=False)
+        self.vocoder = torch.compile(self.vocoder, mode=mode, fullgraph=False)
+        
+        # Pay the compilation cost at startup rather than on the first request
+        logger.info("Warming up compiled SpeechT5 models...")
+        self._synthesize_batch(["Warming up the speech model."], speaker_id=0)
+    
     async def generate_audio_content(
         self,
         content_id: int,
@@ -166,47 +420,38 @@ class AudioLearningService:
             # Split into chapters for better navigation
             chapters = await self._create_chapters(processed_text)
             
-            # Generate audio for each chapter
-            audio_segments = []
+            # Generate summary text
+            summary_text = await self._generate_summary(text)
+            
+            # Generate audio for all chapters and the summary in batched forward passes
+            logger.info(f"Generating audio for {len(chapters)} chapters and summary")
+            audio_segments = await self._generate_chapters_audio_batch(
+                [chapter['text'] for chapter in chapters] + [summary_text],
+                voice_style,
+                user_preferences,
+                is_summary=[False] * len(chapters) + [True]
+            )
+            summary_audio = audio_segments.pop()
+            
+            # Combine all audio segments into one preallocated buffer and create chapter markers
+            full_audio = np.empty(sum(len(segment) for segment in audio_segments), dtype=np.float32)
             chapter_markers = []
-            current_time = 0.0
+            offset = 0
             
-            for i, chapter in enumerate(chapters):
-                logger.info(f"Generating audio for chapter {i+1}/{len(chapters)}")
-                
-                # Generate chapter audio
-                chapter_audio = await self._generate_chapter_audio(
-                    chapter['text'],
-                    voice_style,
-                    user_preferences
-                )
-                
-                # Create chapter marker
+            for i, (chapter, chapter_audio) in enumerate(zip(chapters, audio_segments)):
+                full_audio[offset:offset + len(chapter_audio)] = chapter_audio
                 chapter_markers.append({
                     'title': chapter['title'],
-                    'start_time': current_time,
-                    'duration': len(chapter_audio) / 22050,  # Assuming 22050 Hz sample rate
+                    'start_time': offset / SAMPLE_RATE,
+                    'duration': len(chapter_audio) / SAMPLE_RATE,
                     'chapter_id': i + 1
                 })
-                
-                audio_segments.append(chapter_audio)
-                current_time += len(chapter_audio) / 22050
-            
-            # Combine all audio segments
-            full_audio = np.concatenate(audio_segments)
+                offset += len(chapter_audio)
+            audio_segments = None  # release per-chapter arrays before post-processing
             
             # Apply post-processing
             processed_audio = await self._post_process_audio(full_audio, voice_style)
             
-            # Generate summary audio
-            summary_text = await self._generate_summary(text)
-            summary_audio = await self._generate_chapter_audio(
-                summary_text,
-                voice_style,
-                user_preferences,
-                is_summary=True
-            )
-            
             # Save audio files to S3
             audio_urls = await self._save_audio_files(
                 audio_content.id,
@@ -220,7 +465,7 @@ class AudioLearningService:
                 audio_content,
                 chapter_markers,
                 audio_urls,
-                len(processed_audio) / 22050
+                len(processed_audio) / SAMPLE_RATE
             )
             
             result = {
@@ -228,7 +473,7 @@ class AudioLearningService:
                 'main_audio_url': audio_urls['main'],
                 'summary_audio_url': audio_urls['summary'],
                 'chapters': chapter_markers,
-                'total_duration': len(processed_audio) / 22050,
+                'total_duration': len(processed_audio) / SAMPLE_RATE,
                 'voice_style': voice_style,
                 'generated_at': datetime.utcnow().isoformat()
             }
@@ -245,12 +490,14 @@ class AudioLearningService:
     async def _preprocess_text(self, text: str) -> str:
         """Preprocess text for optimal audio generation"""
         
-        # Replace technical terms with pronunciations
-        processed_text = text
-        for term, pronunciation in self.pronunciation_dict.items():
-            # Use word boundaries to avoid partial matches
-            pattern = r'\b' + re.escape(term) + r'\b'
-            processed_text = re.sub(pattern, pronunciation, processed_text, flags=re.IGNORECASE)
+        # Preprocessing does not depend on voice style; reuse it across renderings
+        cache_key = f"pptext:{self._hash_text(text)}"
+        cached_text = await self._get_cached_text(cache_key)
+        if cached_text is not None:
+            return cached_text
+        
+        # Replace technical terms with pronunciations in a single pass
+        processed_text = self._replace_pronunciations(text)
         
         # Add pauses for better comprehension
         processed_text = self._add_strategic_pauses(processed_text)
@@ -261,26 +508,60 @@ class AudioLearningService:
         # Add emphasis markers for important concepts
         processed_text = self._add_emphasis_markers(processed_text)
         
+        await self._set_cached_text(cache_key, processed_text)
+        
         return processed_text
     
+    def _replace_pronunciations(self, text: str) -> str:
+        """Replace whole-word technical terms with their pronunciations"""
+        
+        text_lower = text.lower()
+        
+        # Offsets from the lowercased text only line up if lowercasing kept the length
+        if self._pronunciation_automaton is None or len(text_lower) != len(text):
+            return self._pronunciation_re.sub(
+                lambda match: self._pronunciation_lookup[match.group(1).lower()],
+                text
+            )
+        
+        # Collect whole-word matches as (start, end, pronunciation)
+        matches = []
+        for end_index, (length, spoken) in self._pronunciation_automaton.iter(text_lower):
+            start, end = end_index - length + 1, end_index + 1
+            if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+                continue
+            if end < len(text) and (text[end].isalnum() or text[end] == '_'):
+                continue
+            matches.append((start, end, spoken))
+        
+        # Keep leftmost-longest, non-overlapping matches and splice in one pass
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        parts = []
+        position = 0
+        for start, end, spoken in matches:
+            if start < position:
+                continue
+            parts.append(text[position:start])
+            parts.append(spoken)
+            position = end
+        parts.append(text[position:])
+        
+        return ''.join(parts)
+    
     def _add_strategic_pauses(self, text: str) -> str:
         """Add strategic pauses for better comprehension"""
         
         # Add longer pauses after sentences
-        text = re.sub(r'\.(\s+)', r'. <break time="0.8s"/> ', text)
+        text = self._SENT_PAUSE_RE.sub(r'. <break time="0.8s"/> ', text)
         
         # Add medium pauses after commas in lists
-        text = re.sub(r',(\s+)', r', <break time="0.4s"/> ', text)
+        text = self._COMMA_PAUSE_RE.sub(r', <break time="0.4s"/> ', text)
         
         # Add pauses after colons
-        text = re.sub(r':(\s+)', r': <break time="0.6s"/> ', text)
+        text = self._COLON_PAUSE_RE.sub(r': <break time="0.6s"/> ', text)
         
         # Add pauses before important transitions
-        transition_words = ['however', 'therefore', 'furthermore', 'additionally', 'consequently']
-        for word in transition_words:
-            pattern = r'\b' + word + r'\b'
-            replacement = f'<break time="0.5s"/> {word}'
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
+        text = self._TRANSITION_RE.sub(r'<break time="0.5s"/> \1', text)
         
         return text
     
@@ -288,23 +569,39 @@ class AudioLearningService:
         """Add emphasis markers for important concepts"""
         
         # Emphasize words in quotes
-        text = re.sub(r'"([^"]+)"', r'<emphasis level="moderate">\1</emphasis>', text)
+        text = self._QUOTE_RE.sub(r'<emphasis level="moderate">\1</emphasis>', text)
+        
+        # Long texts: find technical terms and numbers in a single compiled pass
+        if NUMBA_AVAILABLE and len(text) >= EMPHASIS_SCAN_MIN_LENGTH:
+            return self._wrap_emphasis_spans(text, _find_emphasis_spans(text))
         
         # Emphasize technical terms (words with camelCase or snake_case)
-        text = re.sub(r'\b([a-z]+[A-Z][a-zA-Z]*)\b', r'<emphasis level="moderate">\1</emphasis>', text)
-        text = re.sub(r'\b([a-z]+_[a-z_]+)\b', r'<emphasis level="moderate">\1</emphasis>', text)
+        text = self._CAMEL_CASE_RE.sub(r'<emphasis level="moderate">\1</emphasis>', text)
+        text = self._SNAKE_CASE_RE.sub(r'<emphasis level="moderate">\1</emphasis>', text)
         
         # Emphasize numbers and percentages
-        text = re.sub(r'\b(\d+(?:\.\d+)?%?)\b', r'<emphasis level="strong">\1</emphasis>', text)
+        text = self._NUMBER_RE.sub(r'<emphasis level="strong">\1</emphasis>', text)
         
         return text
     
+    def _wrap_emphasis_spans(self, text: str, spans: np.ndarray) -> str:
+        """Wrap (start, end, kind) spans of text in emphasis markers in one pass"""
+        
+        parts = []
+        position = 0
+        for start, end, kind in spans.tolist():
+            parts.append(text[position:start])
+            parts.append(f'<emphasis level="{EMPHASIS_LEVELS[kind]}">{text[start:end]}</emphasis>')
+            position = end
+        parts.append(text[position:])
+        
+        return ''.join(parts)
+    
     async def _create_chapters(self, text: str) -> List[Dict[str, str]]:
         """Split text into logical chapters with titles"""
         
         # Split by headers (markdown-style)
-        header_pattern = r'^#{1,6}\s+(.+)$'
-        sections = re.split(header_pattern, text, flags=re.MULTILINE)
+        sections = self._HEADER_RE.split(text)
         
         chapters = []
         
@@ -341,58 +638,226 @@ class AudioLearningService:
         
         return chapters
     
-    async def _generate_chapter_audio(
+    async def _generate_chapters_audio_batch(
         self,
-        text: str,
+        texts: List[str],
         voice_style: str,
         user_preferences: Dict[str, Any] = None,
-        is_summary: bool = False
-    ) -> np.ndarray:
-        """Generate audio for a single chapter"""
+        is_summary: List[bool] = None
+    ) -> List[np.ndarray]:
+        """Generate audio for several chapters using batched SpeechT5 forward passes"""
         
         try:
-            # Get voice configuration
-            voice_config = self.voice_configs.get(voice_style, self.voice_configs['professional'])
-            
-            # Apply user preferences
-            if user_preferences:
-                voice_config = self._apply_user_preferences(voice_config, user_preferences)
-            
-            # Adjust for summary content
-            if is_summary:
-                voice_config['speed'] *= 0.95  # Slightly slower for summaries
-                voice_config['emphasis_strength'] *= 1.1  # More emphasis
-            
-            # Tokenize text
-            inputs = self.processor(text=text, return_tensors="pt")
-            
-            # Get speaker embedding
-            speaker_embedding = self.speaker_embeddings[voice_config['speaker_id']].unsqueeze(0)
-            
-            # Generate speech
-            with torch.no_grad():
-                speech = self.model.generate_speech(
-                    inputs["input_ids"],
-                    speaker_embedding,
-                    vocoder=self.vocoder
-                )
+            if is_summary is None:
+                is_summary = [False] * len(texts)
+            
+            chapter_config = self._get_voice_config(voice_style, user_preferences)
+            summary_config = self._get_voice_config(voice_style, user_preferences, is_summary=True)
+            
+            speaker_id = chapter_config['speaker_id']
             
-            # Convert to numpy array
-            audio_array = speech.numpy()
+            # Synthesize only the spoken parts; breaks are inserted as silence afterwards
+            chapter_segments = [self._split_ssml(text) for text in texts]
+            texts = [segment for segments in chapter_segments for segment, _ in segments]
             
-            # Apply voice modifications
-            if voice_config['speed'] != 1.0:
-                audio_array = self._adjust_speed(audio_array, voice_config['speed'])
+            # Reuse decoded spectrograms from the shared cache
+            mel_keys = [f"mel:{speaker_id}:{self._hash_text(text)}" for text in texts]
+            cached_mels = await asyncio.gather(*(cache_manager.get(key) for key in mel_keys))
+            spectrograms = [
+                self._mel_from_bytes(mel_bytes) if mel_bytes is not None else None
+                for mel_bytes in cached_mels
+            ]
             
-            if voice_config['pitch_shift'] != 0:
-                audio_array = self._adjust_pitch(audio_array, voice_config['pitch_shift'])
+            # Decode the rest in fixed-size batches to bound padding and memory,
+            # running the batches concurrently off the event loop
+            missing = [i for i, spectrogram in enumerate(spectrograms) if spectrogram is None]
+            missing_batches = [
+                missing[start:start + SYNTHESIS_BATCH_SIZE]
+                for start in range(0, len(missing), SYNTHESIS_BATCH_SIZE)
+            ]
+            decoded_batches = await asyncio.gather(*(
+                self._run_batch(self._generate_spectrograms, [texts[i] for i in batch_indices], speaker_id)
+                for batch_indices in missing_batches
+            ))
             
-            return audio_array
+            cache_writes = []
+            for batch_indices, decoded in zip(missing_batches, decoded_batches):
+                for i, spectrogram in zip(batch_indices, decoded):
+                    spectrograms[i] = spectrogram
+                    cache_writes.append(
+                        cache_manager.set(mel_keys[i], self._mel_to_bytes(spectrogram), ttl=MEL_CACHE_TTL)
+                    )
+            await asyncio.gather(*cache_writes)
+            
+            # Vocode in fixed-size batches, also concurrently
+            vocoded_batches = await asyncio.gather(*(
+                self._run_batch(self._vocode_batch, spectrograms[start:start + SYNTHESIS_BATCH_SIZE])
+                for start in range(0, len(spectrograms), SYNTHESIS_BATCH_SIZE)
+            ))
+            waveforms = iter([waveform for batch in vocoded_batches for waveform in batch])
+            
+            # Reassemble each chapter from its segments and pauses, then apply voice modifications
+            audio_arrays = []
+            for segments, summary in zip(chapter_segments, is_summary):
+                audio_array = self._join_segments(
+                    [(next(waveforms), pause) for _, pause in segments]
+                )
+                voice_config = summary_config if summary else chapter_config
+                
+                if voice_config['speed'] != 1.0:
+                    audio_array = self._adjust_speed(audio_array, voice_config['speed'])
+                
+                if voice_config['pitch_shift'] != 0:
+                    audio_array = self._adjust_pitch(audio_array, voice_config['pitch_shift'])
+                
+                audio_arrays.append(audio_array)
+            
+            return audio_arrays
             
         except Exception as e:
             logger.error(f"Failed to generate chapter audio: {e}")
             raise
     
+    def _split_ssml(self, text: str) -> List[Tuple[str, float]]:
+        """Strip SSML-like markers, returning (speech text, pause after in seconds) segments"""
+        
+        parts = self._BREAK_TAG_RE.split(self._EMPHASIS_TAG_RE.sub('', text))
+        
+        # re.split alternates text and captured pause durations
+        segments = []
+        for index, part in enumerate(parts):
+            if index % 2:
+                if segments:
+                    segments[-1][1] += float(part)
+            elif part.strip():
+                segments.append([part.strip(), 0.0])
+        
+        return [(segment, pause) for segment, pause in segments]
+    
+    def _join_segments(self, segments: List[Tuple[np.ndarray, float]]) -> np.ndarray:
+        """Concatenate synthesized segments with silence for their trailing pauses"""
+        
+        pieces = []
+        for waveform, pause in segments:
+            pieces.append(waveform)
+            if pause:
+                pieces.append(np.zeros(int(pause * SAMPLE_RATE), dtype=np.float32))
+        
+        return np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+    
+    def _get_voice_config(
+        self,
+        voice_style: str,
+        user_preferences: Dict[str, Any] = None,
+        is_summary: bool = False
+    ) -> Dict[str, Any]:
+        """Resolve the voice configuration for a style, preferences and content type"""
+        
+        voice_config = dict(self.voice_configs.get(voice_style, self.voice_configs['professional']))
+        
+        # Apply user preferences
+        if user_preferences:
+            voice_config = self._apply_user_preferences(voice_config, user_preferences)
+        
+        # Adjust for summary content
+        if is_summary:
+            voice_config['speed'] *= 0.95  # Slightly slower for summaries
+            voice_config['emphasis_strength'] *= 1.1  # More emphasis
+        
+        return voice_config
+    
+    def _synthesize_batch(self, texts: List[str], speaker_id: int) -> List[np.ndarray]:
+        """Run one padded SpeechT5 + HiFi-GAN pass over a batch of texts"""
+        
+        return self._vocode_batch(self._generate_spectrograms(texts, speaker_id))
+    
+    def _generate_spectrograms(self, texts: List[str], speaker_id: int) -> List[torch.Tensor]:
+        """Run one padded SpeechT5 decoder pass and split the mel spectrograms"""
+        
+        # Tokenize all texts together
+        inputs = self.processor(text=texts, padding=True, return_tensors="pt").to(self.device)
+        
+        # Same speaker for every item in the batch
+        speaker_embeddings = self.speaker_embeddings[speaker_id:speaker_id + 1].expand(len(texts), -1)
+        
+        # Decode mel spectrograms
+        with torch.inference_mode(), self._autocast():
+            spectrograms, spectrogram_lengths = self.model.generate_speech(
+                inputs["input_ids"],
+                speaker_embeddings,
+                attention_mask=inputs["attention_mask"],
+                return_output_lengths=True
+            )
+        
+        if spectrograms.dim() == 2:
+            spectrograms = spectrograms.unsqueeze(0)
+        
+        # Trim each spectrogram to its own length
+        return [
+            spectrograms[i, :int(length)]
+            for i, length in enumerate(spectrogram_lengths)
+        ]
+    
+    def _vocode_batch(self, spectrograms: List[torch.Tensor]) -> List[np.ndarray]:
+        """Run one padded HiFi-GAN pass and split the waveforms"""
+        
+        hop_length = int(np.prod(self.vocoder.config.upsample_rates))
+        padded = torch.nn.utils.rnn.pad_sequence(
+            [spectrogram.to(device=self.device, dtype=self.dtype) for spectrogram in spectrograms],
+            batch_first=True
+        )
+        
+        with torch.inference_mode(), self._autocast():
+            speech = self.vocoder(padded)
+        
+        if speech.dim() == 1:
+            speech = speech.unsqueeze(0)
+        speech = speech.float().cpu()
+        
+        # Trim each waveform to its own length
+        return [
+            speech[i, :spectrogram.size(0) * hop_length].numpy()
+            for i, spectrogram in enumerate(spectrograms)
+        ]
+    
+    def _mel_to_bytes(self, spectrogram: torch.Tensor) -> bytes:
+        """Serialize a mel spectrogram as compact float16 bytes"""
+        
+        return spectrogram.float().cpu().numpy().astype(np.float16).tobytes()
+    
+    def _mel_from_bytes(self, mel_bytes: bytes) -> torch.Tensor:
+        """Restore a mel spectrogram serialized by _mel_to_bytes"""
+        
+        mel = np.frombuffer(mel_bytes, dtype=np.float16).reshape(-1, self.model.config.num_mel_bins)
+        return torch.from_numpy(mel.astype(np.float32))
+    
+    async def _run_batch(self, func, *args):
+        """Run a synthesis step in a worker thread once a batch slot is free"""
+        
+        slot = await self._batch_slots.get()
+        try:
+            return await asyncio.to_thread(self._run_on_stream, slot, func, *args)
+        finally:
+            self._batch_slots.put_nowait(slot)
+    
+    def _run_on_stream(self, stream_index: int, func, *args):
+        """Run a synthesis step on one of the pooled CUDA streams and wait for it"""
+        
+        if not self._cuda_streams:
+            return func(*args)
+        
+        stream = self._cuda_streams[stream_index]
+        with torch.cuda.stream(stream):
+            result = func(*args)
+        stream.synchronize()
+        
+        return result
+    
+    def _autocast(self) -> torch.autocast:
+        """Autocast context that keeps matmuls in the model's reduced precision"""
+        
+        return torch.autocast(self.device.type, dtype=self.dtype, enabled=self.dtype != torch.float32)
+    
     def _apply_user_preferences(
         self,
         voice_config: Dict[str, Any],
@@ -424,101 +889,91 @@ class AudioLearningService:
         return config
     
     def _adjust_speed(self, audio: np.ndarray, speed_factor: float) -> np.ndarray:
-        """Adjust audio playback speed"""
-        
-        # Convert to AudioSegment for speed adjustment
-        audio_segment = AudioSegment(
-            audio.tobytes(),
-            frame_rate=22050,
-            sample_width=audio.dtype.itemsize,
-            channels=1
-        )
+        """Adjust audio playback speed without changing pitch"""
         
-        # Adjust speed
-        adjusted = audio_segment.speedup(playback_speed=speed_factor)
-        
-        # Convert back to numpy array
-        return np.array(adjusted.get_array_of_samples(), dtype=np.float32)
+        return librosa.effects.time_stretch(audio, rate=speed_factor)
     
     def _adjust_pitch(self, audio: np.ndarray, semitones: int) -> np.ndarray:
-        """Adjust audio pitch"""
-        
-        # Convert to AudioSegment
-        audio_segment = AudioSegment(
-            audio.tobytes(),
-            frame_rate=22050,
-            sample_width=audio.dtype.itemsize,
-            channels=1
-        )
+        """Adjust audio pitch without changing duration"""
         
-        # Calculate pitch shift ratio
-        pitch_ratio = 2 ** (semitones / 12.0)
-        
-        # Apply pitch shift (simplified implementation)
-        # In production, use more sophisticated pitch shifting
-        new_frame_rate = int(audio_segment.frame_rate * pitch_ratio)
-        pitched = audio_segment._spawn(audio_segment.raw_data, overrides={"frame_rate": new_frame_rate})
-        pitched = pitched.set_frame_rate(22050)
-        
-        return np.array(pitched.get_array_of_samples(), dtype=np.float32)
+        return librosa.effects.pitch_shift(audio, sr=SAMPLE_RATE, n_steps=semitones)
     
     async def _post_process_audio(self, audio: np.ndarray, voice_style: str) -> np.ndarray:
-        """Apply post-processing to improve audio quality"""
-        
-        # Convert to AudioSegment for processing
-        audio_segment = AudioSegment(
-            audio.tobytes(),
-            frame_rate=22050,
-            sample_width=audio.dtype.itemsize,
-            channels=1
-        )
+        """Apply post-processing to improve audio quality (modifies float32 input in place)"""
+        
+        audio = audio.astype(np.float32, copy=False)
+        if not audio.size:
+            return audio
+        
+        # Single scratch buffer reused by normalization and compression
+        magnitude = np.abs(audio)
         
         # Normalize audio levels
-        normalized = normalize(audio_segment)
+        peak = magnitude.max()
+        if peak > 0:
+            gain = 10 ** (-NORMALIZE_HEADROOM_DB / 20) / peak
+            np.multiply(audio, gain, out=audio)
+            np.multiply(magnitude, gain, out=magnitude)
         
-        # Apply dynamic range compression for better listening experience
-        compressed = compress_dynamic_range(normalized, threshold=-20.0, ratio=4.0)
+        # Apply dynamic range compression for better listening experience:
+        # reduce the part of each sample above the threshold by the ratio
+        threshold = 10 ** (COMPRESSOR_THRESHOLD_DB / 20)
+        np.subtract(magnitude, threshold, out=magnitude)
+        np.maximum(magnitude, 0.0, out=magnitude)
+        np.multiply(magnitude, 1.0 - 1.0 / COMPRESSOR_RATIO, out=magnitude)
+        np.copysign(magnitude, audio, out=magnitude)
+        np.subtract(audio, magnitude, out=audio)
         
         # Apply EQ based on voice style
         if voice_style == 'technical':
             # Boost mid frequencies for clarity
-            compressed = compressed.low_pass_filter(8000).high_pass_filter(100)
+            audio = sosfilt(_TECHNICAL_EQ_SOS, audio)
         elif voice_style == 'friendly':
             # Warmer tone
-            compressed = compressed.low_pass_filter(7000)
+            audio = sosfilt(_FRIENDLY_EQ_SOS, audio)
         
-        # Convert back to numpy array
-        return np.array(compressed.get_array_of_samples(), dtype=np.float32)
+        return audio
     
     async def _generate_summary(self, text: str) -> str:
         """Generate a concise summary of the content"""
         
+        cache_key = f"ppsummary:{self._hash_text(text)}"
+        cached_summary = await self._get_cached_text(cache_key)
+        if cached_summary is not None:
+            return cached_summary
+        
         # Simple extractive summarization
-        sentences = re.split(r'[.!?]+', text)
+        sentences = self._SENTENCE_SPLIT_RE.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
         
+        # Tokenize each sentence once, skipping short words
+        sentence_words = [
+            [word for word in sentence.lower().split() if len(word) > 3]
+            for sentence in sentences
+        ]
+        
         # Score sentences based on keyword frequency
-        word_freq = {}
-        for sentence in sentences:
-            words = sentence.lower().split()
-            for word in words:
-                if len(word) > 3:  # Skip short words
-                    word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Score sentences
-        sentence_scores = []
-        for sentence in sentences:
-            score = sum(word_freq.get(word.lower(), 0) for word in sentence.split())
-            sentence_scores.append((score, sentence))
-        
-        # Select top sentences for summary
-        sentence_scores.sort(reverse=True)
-        summary_sentences = [sent for _, sent in sentence_scores[:3]]
+        word_freq = Counter(word for words in sentence_words for word in words)
+        scores = np.fromiter(
+            (sum(word_freq[word] for word in words) for words in sentence_words),
+            dtype=np.int64,
+            count=len(sentence_words)
+        )
+        
+        # Select top sentences for summary, kept in document order
+        top_indices = np.arange(len(sentences))
+        if len(sentences) > SUMMARY_SENTENCES:
+            top_indices = np.sort(np.argpartition(-scores, SUMMARY_SENTENCES)[:SUMMARY_SENTENCES])
+        summary_sentences = [sentences[i] for i in top_indices]
         
         summary = '. '.join(summary_sentences) + '.'
         
         # Add summary introduction
-        return f"Here's a quick summary of this content: {summary}"
+        summary = f"Here's a quick summary of this content: {summary}"
+        
+        await self._set_cached_text(cache_key, summary)
+        
+        return summary
     
     async def _save_audio_files(
         self,
@@ -533,28 +988,24 @@ class AudioLearningService:
             bucket_name = settings.S3_AUDIO_BUCKET
             base_key = f"audio/{audio_content_id}/{voice_style}"
             
-            # Save main audio
             main_key = f"{base_key}/main.wav"
-            main_buffer = self._audio_to_buffer(main_audio)
-            
-            self.s3_client.put_object(
-                Bucket=bucket_name,
-                Key=main_key,
-                Body=main_buffer,
-                ContentType='audio/wav',
-                CacheControl='max-age=31536000'  # 1 year cache
-            )
-            
-            # Save summary audio
             summary_key = f"{base_key}/summary.wav"
-            summary_buffer = self._audio_to_buffer(summary_audio)
-            
-            self.s3_client.put_object(
-                Bucket=bucket_name,
-                Key=summary_key,
-                Body=summary_buffer,
-                ContentType='audio/wav',
-                CacheControl='max-age=31536000'
+            
+            extra_args = {
+                'ContentType': 'audio/wav',
+                'CacheControl': 'max-age=31536000'  # 1 year cache
+            }
+            
+            # Upload main and summary audio concurrently; upload_fileobj switches
+            # to multipart uploads for large files
+            s3 = await s3_manager.get_client()
+            await asyncio.gather(
+                s3.upload_fileobj(
+                    self._audio_to_buffer(main_audio), bucket_name, main_key, ExtraArgs=extra_args
+                ),
+                s3.upload_fileobj(
+                    self._audio_to_buffer(summary_audio), bucket_name, summary_key, ExtraArgs=extra_args
+                )
             )
             
             # Generate URLs
@@ -570,14 +1021,16 @@ class AudioLearningService:
             logger.error(f"Failed to save audio files to S3: {e}")
             raise
     
-    def _audio_to_buffer(self, audio: np.ndarray) -> bytes:
-        """Convert audio array to WAV buffer"""
+    def _audio_to_buffer(self, audio: np.ndarray) -> io.BytesIO:
+        """Encode audio array as a WAV file object ready for upload"""
+        
+        # 16-bit PCM is plenty for speech and half the size of float32 WAV
+        pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
         
-        import io
         buffer = io.BytesIO()
-        sf.write(buffer, audio, 22050, format='WAV')
+        sf.write(buffer, pcm, SAMPLE_RATE, format='WAV', subtype='PCM_16')
         buffer.seek(0)
-        return buffer.read()
+        return buffer
     
     def _generate_cache_key(
         self,
@@ -588,7 +1041,29 @@ class AudioLearningService:
         """Generate cache key for audio content"""
         
         content = f"{text}:{voice_style}:{json.dumps(user_preferences or {}, sort_keys=True)}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return self._hash_text(content)
+    
+    async def _get_cached_text(self, cache_key: str) -> Optional[str]:
+        """Look up preprocessed text in the in-process LRU, then the shared cache"""
+        
+        cached_text = self._text_cache.get(cache_key)
+        if cached_text is None:
+            cached_text = await cache_manager.get(cache_key)
+            if cached_text is not None:
+                self._text_cache[cache_key] = cached_text
+        
+        return cached_text
+    
+    async def _set_cached_text(self, cache_key: str, text: str):
+        """Store preprocessed text in the in-process LRU and the shared cache"""
+        
+        self._text_cache[cache_key] = text
+        await cache_manager.set(cache_key, text, ttl=TEXT_CACHE_TTL)
+    
+    def _hash_text(self, text: str) -> str:
+        """Hash text for use in cache keys"""
+        
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
     
     async def _get_or_create_audio_content(self, content_id: int, voice_style: str) -> AudioContent:
         """Get existing or create new audio content record"""
@@ -3,221 +3,423 @@ Cache service for SkillForge AI Backend
 Handles Redis caching operations
 """
 
-from typing import Optional, Any, Dict, List
-from redis import Redis
-import json
-import pickle
+from typing import Optional, Any, AsyncIterator, Dict, List, Tuple, Union
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from cachetools import TTLCache
+import orjson
+import msgpack
+import lz4.block
+from fnmatch import fnmatchcase
 import logging
+import time
 from datetime import timedelta
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# One-byte format tag prefixed to every stored payload
+_FMT_ORJSON = b'\x01'
+_FMT_MSGPACK = b'\x02'
+_FMT_PICKLE = b'\x03'  # no longer written; existing entries are read as misses
+_FMT_LZ4 = b'\x04'  # wraps a compressed, format-tagged payload
+
+# Tagged payloads larger than this are stored lz4-compressed
+COMPRESSION_THRESHOLD = 2048
+
+# Keys fetched per SCAN step and deleted per UNLINK in clear_pattern
+SCAN_BATCH_SIZE = 500
+
+# Keys written per set_many script call, bounding how long each call holds Redis
+SET_MANY_CHUNK_SIZE = 1000
+
+# Sets KEYS[i] to ARGV[i] with the TTL passed as the last ARGV, looping server-side
+_SET_MANY_SCRIPT = """
+local ttl = ARGV[#KEYS + 1]
+for i = 1, #KEYS do
+    redis.call('SET', KEYS[i], ARGV[i], 'EX', ttl)
+end
+return #KEYS
+"""
+
+# Seconds an INFO snapshot is reused before querying Redis again
+INFO_CACHE_TTL = 5.0
+
+# In-process cache for hot user and skill keys; the TTL bounds cross-process staleness
+LOCAL_CACHE_MAX_SIZE = 10_000
+LOCAL_CACHE_TTL = 30
+
+# Failures that degrade a cache read to a miss: Redis errors plus payloads
+# that cannot be decoded
+_DECODE_ERRORS = (TypeError, ValueError, lz4.block.LZ4BlockError)
+_CACHE_ERRORS = (RedisError,) + _DECODE_ERRORS
+
+# Datetimes, UUIDs, dataclasses and numpy arrays are encoded by orjson itself
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+# Serializer callables bound once at import
+_dumps = orjson.dumps
+_loads = orjson.loads
+_packb = msgpack.packb
+_unpackb = msgpack.unpackb
+_lz4_compress = lz4.block.compress
+_lz4_decompress = lz4.block.decompress
+
+
+def _encode(value: Any) -> bytes:
+    """Serialize a value for storage, compressing large payloads"""
+    return _compress(_serialize(value))
+
+
+def _compress(payload: bytes) -> bytes:
+    """Wrap a tagged payload in lz4 compression when it is large enough to pay off"""
+    if len(payload) > COMPRESSION_THRESHOLD:
+        return _FMT_LZ4 + _lz4_compress(payload)
+    return payload
+
+
+def _serialize(value: Any) -> bytes:
+    """Serialize a value as orjson, or msgpack for bytes and non-string keys, tagged with its format"""
+    try:
+        return _FMT_ORJSON + _dumps(value, option=_ORJSON_OPTIONS)
+    except TypeError:
+        pass
+    
+    try:
+        return _FMT_MSGPACK + _packb(value, use_bin_type=True)
+    except (TypeError, ValueError, OverflowError) as e:
+        raise TypeError(f"Cannot cache value of type {type(value).__name__}") from e
+
+
+def _decode(value: Optional[bytes]) -> Any:
+    """Deserialize a tagged payload by dispatching on its format byte"""
+    if value is None:
+        return None
+    
+    if value[:1] == _FMT_LZ4:
+        value = _lz4_decompress(value[1:])
+    
+    fmt = value[:1]
+    if fmt == _FMT_ORJSON:
+        return _loads(value[1:])
+    if fmt == _FMT_MSGPACK:
+        # Non-string keys are why msgpack was chosen, so they must be accepted on the way back
+        return _unpackb(value[1:], raw=False, strict_map_key=False)
+    if fmt == _FMT_PICKLE:
+        # Unpickling cache contents would run arbitrary code if the cache were poisoned
+        logger.warning("Ignoring pickled cache payload")
+        return None
+    
+    # Untagged values written before format tags or by other clients
+    try:
+        return _loads(value)
+    except orjson.JSONDecodeError:
+        return value.decode('utf-8')
+
+
+def _local_key(key: Union[str, bytes]) -> bytes:
+    """Normalize a key to the bytes form the local cache is keyed by"""
+    return key.encode() if isinstance(key, str) else key
+
+
+def _decode_or_miss(value: Optional[bytes]) -> Any:
+    """Decode one payload of a multi-key read, treating an undecodable one as a miss"""
+    try:
+        return _decode(value)
+    except _DECODE_ERRORS:
+        logger.warning("Ignoring undecodable cache payload", exc_info=True)
+        return None
+
 
 class CacheService:
     """Service class for caching operations"""
     
+    # INFO snapshots by section, shared across the per-request instances
+    _info_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+    
+    # Hot-key payloads, also shared across instances; values are decoded per hit so
+    # callers never share a mutable object
+    _local = TTLCache(maxsize=LOCAL_CACHE_MAX_SIZE, ttl=LOCAL_CACHE_TTL)
+    
+    # Bumped by every local eviction; a read that started before an eviction must not
+    # refill the cache with the value it fetched, which may predate the write
+    _local_generation = 0
+    
+    # Pre-encoded prefixes for the hottest keys; redis-py sends bytes keys as-is
+    _USER_PREFIX = b"user:"
+    _SKILL_PREFIX = b"skill:"
+    
     def __init__(self, redis_client: Redis):
         self.redis = redis_client
         self.default_ttl = settings.CACHE_TTL
+        self._set_many_script = self.redis.register_script(_SET_MANY_SCRIPT)
+    
+    async def get(self, key: Union[str, bytes]) -> Optional[Any]:
+        """Get value from cache; None means a miss, so no exists() check is needed first"""
+        try:
+            return _decode(await self.redis.get(key))
+            
+        except _CACHE_ERRORS:
+            logger.exception("Error getting cache key %s", key)
+            return None
     
-    async def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
+    async def get_and_refresh(self, key: Union[str, bytes], ttl: int) -> Optional[Any]:
+        """Get value from cache and reset its TTL in the same round trip (GETEX)"""
         try:
-            value = self.redis.get(key)
-            if value is None:
-                return None
+            return _decode(await self.redis.getex(key, ex=ttl))
             
-            # Try to deserialize as JSON first, then pickle
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                try:
-                    return pickle.loads(value)
-                except (pickle.PickleError, TypeError):
-                    return value.decode('utf-8') if isinstance(value, bytes) else value
-                    
-        except Exception as e:
-            logger.error(f"Error getting cache key {key}: {e}")
+        except _CACHE_ERRORS:
+            logger.exception("Error getting cache key %s", key)
             return None
     
     async def set(
         self, 
-        key: str, 
+        key: Union[str, bytes], 
         value: Any, 
         ttl: Optional[int] = None,
-        serialize_json: bool = True
+        only_if_absent: bool = False
     ) -> bool:
-        """Set value in cache"""
+        """Set value in cache; with only_if_absent, keep an existing value (SET NX)"""
+        if ttl is None:
+            ttl = self.default_ttl
+        
+        # Serialize value; values orjson and msgpack cannot encode raise TypeError
+        serialized_value = _encode(value)
+        
         try:
-            if ttl is None:
-                ttl = self.default_ttl
+            return bool(await self.redis.set(key, serialized_value, ex=ttl, nx=only_if_absent))
             
-            # Serialize value
-            if serialize_json:
-                try:
-                    serialized_value = json.dumps(value)
-                except (TypeError, ValueError):
-                    # Fall back to pickle for complex objects
-                    serialized_value = pickle.dumps(value)
-            else:
-                serialized_value = pickle.dumps(value)
-            
-            return self.redis.setex(key, ttl, serialized_value)
-            
-        except Exception as e:
-            logger.error(f"Error setting cache key {key}: {e}")
+        except RedisError:
+            logger.exception("Error setting cache key %s", key)
             return False
+        finally:
+            # Evicted only once the write has landed so a racing read cannot re-cache the old value
+            self._evict_local(key)
     
-    async def delete(self, key: str) -> bool:
-        """Delete key from cache"""
+    async def delete(self, key: Union[str, bytes]) -> int:
+        """Delete key from cache, returning the number of keys removed"""
         try:
-            return bool(self.redis.delete(key))
-        except Exception as e:
-            logger.error(f"Error deleting cache key {key}: {e}")
-            return False
+            return await self.redis.delete(key)
+        except RedisError:
+            logger.exception("Error deleting cache key %s", key)
+            return 0
+        finally:
+            self._evict_local(key)
     
-    async def exists(self, key: str) -> bool:
-        """Check if key exists in cache"""
+    async def exists(self, key: str) -> int:
+        """Check if key exists in cache without fetching it; use get() when the value is needed"""
         try:
-            return bool(self.redis.exists(key))
-        except Exception as e:
-            logger.error(f"Error checking cache key {key}: {e}")
-            return False
+            return await self.redis.exists(key)
+        except RedisError:
+            logger.exception("Error checking cache key %s", key)
+            return 0
     
     async def expire(self, key: str, ttl: int) -> bool:
         """Set expiration time for key"""
         try:
-            return bool(self.redis.expire(key, ttl))
-        except Exception as e:
-            logger.error(f"Error setting expiration for cache key {key}: {e}")
+            return await self.redis.expire(key, ttl)
+        except RedisError:
+            logger.exception("Error setting expiration for cache key %s", key)
             return False
     
     async def get_ttl(self, key: str) -> int:
         """Get time to live for key"""
         try:
-            return self.redis.ttl(key)
-        except Exception as e:
-            logger.error(f"Error getting TTL for cache key {key}: {e}")
+            return await self.redis.ttl(key)
+        except RedisError:
+            logger.exception("Error getting TTL for cache key %s", key)
             return -1
     
     async def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """Increment numeric value"""
         try:
-            return self.redis.incrby(key, amount)
-        except Exception as e:
-            logger.error(f"Error incrementing cache key {key}: {e}")
+            return await self.redis.incrby(key, amount)
+        except RedisError:
+            logger.exception("Error incrementing cache key %s", key)
             return None
     
     async def decrement(self, key: str, amount: int = 1) -> Optional[int]:
         """Decrement numeric value"""
         try:
-            return self.redis.decrby(key, amount)
-        except Exception as e:
-            logger.error(f"Error decrementing cache key {key}: {e}")
+            return await self.redis.decrby(key, amount)
+        except RedisError:
+            logger.exception("Error decrementing cache key %s", key)
             return None
     
     async def get_many(self, keys: List[str]) -> Dict[str, Any]:
         """Get multiple values from cache"""
+        if not keys:
+            return {}
+        
         try:
-            values = self.redis.mget(keys)
-            result = {}
-            
-            for key, value in zip(keys, values):
-                if value is not None:
-                    try:
-                        result[key] = json.loads(value)
-                    except (json.JSONDecodeError, TypeError):
-                        try:
-                            result[key] = pickle.loads(value)
-                        except (pickle.PickleError, TypeError):
-                            result[key] = value.decode('utf-8') if isinstance(value, bytes) else value
-                else:
-                    result[key] = None
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"Error getting multiple cache keys: {e}")
+            values = await self.redis.mget(keys)
+        except RedisError:
+            logger.exception("Error getting multiple cache keys")
             return {}
+        
+        # Decoded per key so one bad payload does not hide the others
+        return dict(zip(keys, map(_decode_or_miss, values)))
     
     async def set_many(self, mapping: Dict[str, Any], ttl: Optional[int] = None) -> bool:
         """Set multiple values in cache"""
+        if ttl is None:
+            ttl = self.default_ttl
+        
+        keys = list(mapping)
+        values = [_encode(value) for value in mapping.values()]
+        
         try:
-            if ttl is None:
-                ttl = self.default_ttl
+            # One round trip and one command parse per chunk instead of one SETEX per key
+            for start in range(0, len(keys), SET_MANY_CHUNK_SIZE):
+                end = start + SET_MANY_CHUNK_SIZE
+                await self._set_many_script(keys=keys[start:end], args=values[start:end] + [ttl])
             
-            pipe = self.redis.pipeline()
+            return True
             
-            for key, value in mapping.items():
-                try:
-                    serialized_value = json.dumps(value)
-                except (TypeError, ValueError):
-                    serialized_value = pickle.dumps(value)
+        except RedisError:
+            logger.exception("Error setting multiple cache keys")
+            return False
+    
+    async def set_many_iter(
+        self,
+        items: AsyncIterator[Tuple[str, Any]],
+        ttl: Optional[int] = None,
+        chunk_size: int = SET_MANY_CHUNK_SIZE
+    ) -> int:
+        """Set values streamed from an async iterator, holding at most one chunk in memory"""
+        if ttl is None:
+            ttl = self.default_ttl
+        
+        keys = []
+        values = []
+        written = 0
+        
+        try:
+            async for key, value in items:
+                keys.append(key)
+                values.append(_encode(value))
                 
-                pipe.setex(key, ttl, serialized_value)
+                if len(keys) >= chunk_size:
+                    await self._set_many_script(keys=keys, args=values + [ttl])
+                    written += len(keys)
+                    keys, values = [], []
             
-            results = pipe.execute()
-            return all(results)
+            if keys:
+                await self._set_many_script(keys=keys, args=values + [ttl])
+                written += len(keys)
             
-        except Exception as e:
-            logger.error(f"Error setting multiple cache keys: {e}")
-            return False
+            return written
+            
+        except RedisError:
+            logger.exception("Error setting streamed cache keys")
+            return written
     
     async def delete_many(self, keys: List[str]) -> int:
         """Delete multiple keys from cache"""
         try:
-            return self.redis.delete(*keys)
-        except Exception as e:
-            logger.error(f"Error deleting multiple cache keys: {e}")
+            return await self.redis.delete(*keys)
+        except RedisError:
+            logger.exception("Error deleting multiple cache keys")
             return 0
+        finally:
+            self._evict_local(*keys)
     
     async def clear_pattern(self, pattern: str) -> int:
         """Delete all keys matching pattern"""
         try:
-            keys = self.redis.keys(pattern)
-            if keys:
-                return self.redis.delete(*keys)
-            return 0
-        except Exception as e:
-            logger.error(f"Error clearing cache pattern {pattern}: {e}")
+            # SCAN walks the keyspace incrementally instead of blocking Redis like KEYS,
+            # and UNLINK frees the values in a background thread
+            deleted = 0
+            batch = []
+            async for key in self.redis.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    deleted += await self.redis.unlink(*batch)
+                    batch.clear()
+            
+            if batch:
+                deleted += await self.redis.unlink(*batch)
+            
+            return deleted
+        except RedisError:
+            logger.exception("Error clearing cache pattern %s", pattern)
             return 0
+        finally:
+            # Redis glob syntax matches fnmatch for the * and ? patterns used here
+            local_pattern = _local_key(pattern)
+            self._evict_local(*[key for key in list(self._local) if fnmatchcase(key, local_pattern)])
     
-    async def get_info(self) -> Dict[str, Any]:
-        """Get Redis server information"""
+    async def get_info(self, section: str = 'stats') -> Dict[str, Any]:
+        """Get Redis server information for one INFO section, cached for a few seconds"""
         try:
-            return self.redis.info()
-        except Exception as e:
-            logger.error(f"Error getting cache info: {e}")
+            cached_at, info = self._info_cache.get(section, (0.0, {}))
+            now = time.monotonic()
+            if now - cached_at < INFO_CACHE_TTL:
+                return info
+            
+            info = await self.redis.info(section=section)
+            self._info_cache[section] = (now, info)
+            return info
+        except RedisError:
+            logger.exception("Error getting cache info")
             return {}
     
+    @classmethod
+    def _evict_local(cls, *keys: Union[str, bytes]) -> None:
+        """Drop keys from the in-process cache and stop in-flight reads from refilling it"""
+        cls._local_generation += 1
+        for key in keys:
+            cls._local.pop(_local_key(key), None)
+    
+    async def _get_through_local(self, key: bytes, refresh_ttl: Optional[int] = None) -> Optional[Any]:
+        """Get a hot key from the in-process cache, falling back to Redis"""
+        if refresh_ttl:
+            # A sliding expiration has to reach Redis on every read
+            return await self.get_and_refresh(key, refresh_ttl)
+        
+        try:
+            payload = self._local.get(key)
+            if payload is not None:
+                return _decode(payload)
+            
+            generation = CacheService._local_generation
+            payload = await self.redis.get(key)
+            value = _decode(payload)
+            if value is not None and generation == CacheService._local_generation:
+                self._local[key] = payload
+            return value
+            
+        except _CACHE_ERRORS:
+            logger.exception("Error getting cache key %s", key)
+            return None
+    
     # Specialized caching methods
     
-    async def cache_user(self, user_id: str, user_data: Dict[str, Any], ttl: int = 3600):
+    async def cache_user(self, user_id: str, user_data: Dict[str, Any], ttl: int = 3600, only_if_absent: bool = False):
         """Cache user data"""
-        key = f"user:{user_id}"
-        return await self.set(key, user_data, ttl)
+        key = self._USER_PREFIX + str(user_id).encode()
+        return await self.set(key, user_data, ttl, only_if_absent=only_if_absent)
     
-    async def get_cached_user(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get cached user data"""
-        key = f"user:{user_id}"
-        return await self.get(key)
+    async def get_cached_user(self, user_id: str, refresh_ttl: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Get cached user data, optionally sliding its expiration forward by refresh_ttl"""
+        key = self._USER_PREFIX + str(user_id).encode()
+        return await self._get_through_local(key, refresh_ttl)
     
     async def invalidate_user_cache(self, user_id: str) -> bool:
         """Invalidate user cache"""
         pattern = f"user:{user_id}*"
         return await self.clear_pattern(pattern) > 0
     
-    async def cache_skill_data(self, skill_id: str, skill_data: Dict[str, Any], ttl: int = 7200):
+    async def cache_skill_data(self, skill_id: str, skill_data: Dict[str, Any], ttl: int = 7200, only_if_absent: bool = False):
         """Cache skill data"""
-        key = f"skill:{skill_id}"
-        return await self.set(key, skill_data, ttl)
+        key = self._SKILL_PREFIX + str(skill_id).encode()
+        return await self.set(key, skill_data, ttl, only_if_absent=only_if_absent)
     
     async def get_cached_skill_data(self, skill_id: str) -> Optional[Dict[str, Any]]:
         """Get cached skill data"""
-        key = f"skill:{skill_id}"
-        return await self.get(key)
+        key = self._SKILL_PREFIX + str(skill_id).encode()
+        return await self._get_through_local(key)
     
     async def cache_assessment_results(self, user_id: str, assessment_id: str, results: Dict[str, Any], ttl: int = 86400):
         """Cache assessment results"""
@@ -230,15 +432,41 @@ class CacheService:
         return await self.get(key)
     
     async def cache_job_matches(self, user_id: str, matches: List[Dict[str, Any]], ttl: int = 3600):
-        """Cache job matches for user"""
+        """Cache job matches for user as one compact msgpack payload"""
         key = f"job_matches:{user_id}"
-        return await self.set(key, matches, ttl)
+        try:
+            payload = _compress(_FMT_MSGPACK + _packb(matches, use_bin_type=True))
+        except (TypeError, ValueError, OverflowError):
+            # Matches carrying datetimes or other orjson-only types take the generic path
+            return await self.set(key, matches, ttl)
+        
+        try:
+            return await self.redis.setex(key, ttl, payload)
+        except RedisError:
+            logger.exception("Error setting cache key %s", key)
+            return False
     
     async def get_cached_job_matches(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
-        """Get cached job matches for user"""
+        """Get cached job matches for user; the format tag selects msgpack decoding"""
         key = f"job_matches:{user_id}"
         return await self.get(key)
     
+    async def get_user_bundle(self, user_id: str, path_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get a user's cached data, job matches and optionally a learning path in one MGET"""
+        names = ['user', 'job_matches']
+        keys = [self._USER_PREFIX + str(user_id).encode(), f"job_matches:{user_id}"]
+        if path_id is not None:
+            names.append('learning_path')
+            keys.append(f"learning_path:{path_id}")
+        
+        try:
+            values = await self.redis.mget(keys)
+        except RedisError:
+            logger.exception("Error getting cache bundle for user %s", user_id)
+            return dict.fromkeys(names)
+        
+        return dict(zip(names, map(_decode_or_miss, values)))
+    
     async def cache_learning_path(self, path_id: str, path_data: Dict[str, Any], ttl: int = 7200):
         """Cache learning path data"""
         key = f"learning_path:{path_id}"
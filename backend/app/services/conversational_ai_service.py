@@ -5,23 +5,178 @@ Implements DialoGPT-based career coaching and guidance
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, AsyncIterator, Callable, ClassVar, Deque, Optional, Tuple
 import json
 import re
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
 from enum import Enum
+from cachetools import Cache, LRUCache, TTLCache
 
 # Import AI services (with fallback for development)
 try:
     from transformers import AutoModelForCausalLM, AutoTokenizer
     import torch
+    import torch.nn.functional as F
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
 
+try:
+    from transformers import DynamicCache
+except ImportError:
+    DynamicCache = None
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    import ctranslate2
+    CTRANSLATE2_AVAILABLE = True
+except ImportError:
+    CTRANSLATE2_AVAILABLE = False
+
+try:
+    from optimum.bettertransformer import BetterTransformer
+    BETTER_TRANSFORMER_AVAILABLE = True
+except ImportError:
+    BETTER_TRANSFORMER_AVAILABLE = False
+
+from app.core.config import settings
+
+try:
+    import bitsandbytes  # noqa: F401
+    from transformers import BitsAndBytesConfig
+    BITSANDBYTES_AVAILABLE = True
+except ImportError:
+    BITSANDBYTES_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# DialoGPT generation settings
+DIALOGPT_HISTORY_MESSAGES = 5  # messages used to rebuild context when no KV cache is held
+DIALOGPT_MAX_NEW_TOKENS = 50
+DIALOGPT_REPETITION_PENALTY = 1.1  # greedy decoding; discourages echoing the turn back
+DIALOGPT_MAX_MESSAGE_TOKENS = 512  # longer messages are truncated when tokenized
+
+# Total tokens of DialoGPT KV cache kept resident between turns, least recently used
+# sessions evicted first (about 100 KB per token for DialoGPT-medium in fp16). Must
+# be at least the model's position table so a full-length session still fits
+KV_CACHE_MAX_TOKENS = 8192
+
+# In-memory conversation sessions; idle sessions expire after SESSION_TTL seconds
+SESSION_CACHE_MAX_SESSIONS = 10_000
+SESSION_TTL = 3600
+SESSION_MAX_MESSAGES = 64  # most recent messages kept per session
+
+# Micro-batching of concurrent DialoGPT turns
+DIALOGPT_MAX_BATCH_SIZE = 8
+DIALOGPT_MAX_BATCH_WAIT = 0.03  # seconds to wait for more turns to join a batch
+
+
+def _ns_to_iso(timestamp_ns: int) -> str:
+    """Format a time.time_ns() timestamp as an ISO 8601 UTC string"""
+    return datetime.fromtimestamp(timestamp_ns / 1e9, tz=timezone.utc).isoformat()
+
+
+def _cache_layers(past_key_values: Any) -> List[Tuple[Any, Any]]:
+    """Return a KV cache as per-layer (key, value) tensors"""
+    # Cache objects expose layers (transformers >= 4.56) or key/value lists (older);
+    # to_legacy_cache is gone in transformers 5, so read the tensors directly
+    if hasattr(past_key_values, "layers"):
+        return [(layer.keys, layer.values) for layer in past_key_values.layers]
+    if hasattr(past_key_values, "key_cache"):
+        return list(zip(past_key_values.key_cache, past_key_values.value_cache))
+    return list(past_key_values)
+
+
+def _build_cache(layers: Any) -> Any:
+    """Wrap per-layer (key, value) tensors in the cache class this transformers version expects"""
+    if layers is None or DynamicCache is None:
+        return layers
+    cache = DynamicCache()
+    for layer_index, (key, value) in enumerate(layers):
+        cache.update(key, value, layer_index)
+    return cache
+
+
+class _BatchScheduler:
+    """Coalesce concurrent requests into batches handled by one call"""
+    
+    def __init__(self, run_batch, max_batch_size: int, max_wait: float):
+        self._run_batch = run_batch
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def submit(self, item: Any) -> Any:
+        """Queue one request and wait for its result"""
+        # Started lazily: the service is created at import, before an event loop runs
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._drain())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+    
+    async def _drain(self):
+        """Collect up to max_batch_size requests, waiting at most max_wait after the first"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait
+            
+            while len(batch) < self._max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # The model call blocks, so run it off the event loop; batches still run one at a time
+            try:
+                results = await asyncio.to_thread(self._run_batch, [item for item, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class _SessionCache(TTLCache):
+    """LRU + TTL session store that calls on_evict whenever sessions are evicted or expire"""
+    
+    def __init__(self, maxsize: int, ttl: float, on_evict):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_evict = on_evict
+    
+    def popitem(self):
+        item = super().popitem()
+        self._on_evict()
+        return item
+    
+    def expire(self, time=None):
+        # Cache.__len__ reads the raw size; currsize and len() would re-enter expire()
+        size = Cache.__len__(self)
+        expired = super().expire(time)
+        if Cache.__len__(self) < size:
+            self._on_evict()
+        return expired
+
 
 class ConversationContext(Enum):
     """Conversation context types"""
@@ -34,37 +189,132 @@ class ConversationContext(Enum):
     GENERAL = "general"
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class ConversationMessage:
     """Individual conversation message"""
     role: str  # 'user' or 'assistant'
     content: str
-    timestamp: datetime
+    timestamp: int  # time.time_ns()
     context: ConversationContext
     metadata: Dict[str, Any] = None
+    token_ids: Optional[List[int]] = None  # DialoGPT encoding of content, filled on first use
+
 
+@dataclass(slots=True)
+class DialogptCacheState:
+    """DialoGPT attention cache for a session and how many messages it covers"""
+    past_key_values: Any
+    message_count: int
 
-@dataclass
+
+@dataclass(slots=True, kw_only=True)
 class ConversationSession:
     """Conversation session with context"""
     session_id: str
     user_id: str
-    messages: List[ConversationMessage]
     context: ConversationContext
     user_profile: Dict[str, Any]
-    created_at: datetime
-    updated_at: datetime
+    created_at: int  # time.time_ns()
+    updated_at: int
+    messages: Deque[ConversationMessage] = field(default_factory=lambda: deque(maxlen=SESSION_MAX_MESSAGES))
+    message_count: int = 0  # every message ever added, including those rotated out of messages
     is_active: bool = True
+    
+    def add_message(self, message: ConversationMessage):
+        """Append a message, dropping the oldest once the history is full"""
+        self.messages.append(message)
+        self.message_count += 1
+    
+    def recent_messages(self, count: int) -> List[ConversationMessage]:
+        """Return up to the last count messages, oldest first"""
+        recent = list(islice(reversed(self.messages), count))
+        recent.reverse()
+        return recent
 
 
 class ConversationalAIService:
     """Advanced conversational AI coach using DialoGPT and career expertise"""
     
+    _SUGGESTIONS: ClassVar[Dict[ConversationContext, Tuple[str, ...]]] = {
+        ConversationContext.CAREER_GUIDANCE: (
+            "What are my career strengths?",
+            "How do I set career goals?",
+            "What industries should I consider?"
+        ),
+        ConversationContext.SKILL_DEVELOPMENT: (
+            "What skills are in demand?",
+            "How do I learn new technologies?",
+            "Should I get certifications?"
+        ),
+        ConversationContext.JOB_SEARCH: (
+            "How do I improve my resume?",
+            "Where should I look for jobs?",
+            "How do I network effectively?"
+        ),
+        ConversationContext.INTERVIEW_PREP: (
+            "What are common interview questions?",
+            "How do I handle technical interviews?",
+            "What questions should I ask?"
+        )
+    }
+    _DEFAULT_SUGGESTIONS: ClassVar[Tuple[str, ...]] = (
+        "Tell me about your career goals",
+        "What challenges are you facing?",
+        "How can I help you today?"
+    )
+    
+    _FOLLOW_UPS: ClassVar[Dict[ConversationContext, str]] = {
+        ConversationContext.CAREER_GUIDANCE: " What specific career goals are you working towards?",
+        ConversationContext.SKILL_DEVELOPMENT: " Which skills would you like to focus on developing?",
+        ConversationContext.JOB_SEARCH: " What type of roles are you most interested in?",
+        ConversationContext.INTERVIEW_PREP: " What kind of interview are you preparing for?"
+    }
+    
+    _FALLBACK_RESPONSES: ClassVar[Tuple[str, ...]] = (
+        "That's an interesting point. Could you tell me more about your specific situation?",
+        "I understand your concern. What would you like to focus on first?",
+        "Let's explore that together. What's your main goal in this area?",
+        "That's a great question. What's been your experience with this so far?",
+        "I'm here to help you succeed. What specific guidance are you looking for?"
+    )
+    
+    _CONTEXT_GREETINGS: ClassVar[Dict[ConversationContext, str]] = {
+        ConversationContext.CAREER_GUIDANCE: "I'm excited to help you explore your career path and set meaningful goals.",
+        ConversationContext.SKILL_DEVELOPMENT: "Let's work together to identify and develop the skills that will advance your career.",
+        ConversationContext.JOB_SEARCH: "I'm here to guide you through your job search journey and help you find the right opportunities.",
+        ConversationContext.INTERVIEW_PREP: "Let's prepare you for interview success with practice and strategic guidance.",
+        ConversationContext.SALARY_NEGOTIATION: "I'll help you approach salary negotiations with confidence and strategy."
+    }
+    
+    _CONTEXT_SUMMARIES: ClassVar[Dict[ConversationContext, str]] = {
+        ConversationContext.CAREER_GUIDANCE: "Discussed career goals and professional development",
+        ConversationContext.SKILL_DEVELOPMENT: "Explored skill development opportunities and learning paths",
+        ConversationContext.JOB_SEARCH: "Covered job search strategies and opportunities",
+        ConversationContext.INTERVIEW_PREP: "Prepared for upcoming interviews and practice sessions",
+        ConversationContext.SALARY_NEGOTIATION: "Discussed salary negotiation strategies and tactics"
+    }
+    
     def __init__(self):
         self.model = None
         self.tokenizer = None
-        self.conversation_sessions = {}  # In-memory storage for demo
+        self.ct2_generator = None
+        self._eos_id = None
+        self._pad_id = None
+        self._kv_caches = LRUCache(  # session_id -> DialogptCacheState, sized in cached tokens
+            maxsize=KV_CACHE_MAX_TOKENS,
+            getsizeof=lambda state: self._cache_length(state.past_key_values)
+        )
+        self.conversation_sessions = _SessionCache(
+            SESSION_CACHE_MAX_SESSIONS, SESSION_TTL, self._release_evicted_kv_caches
+        )
+        self._batch_scheduler = _BatchScheduler(
+            self._decode_replies, DIALOGPT_MAX_BATCH_SIZE, DIALOGPT_MAX_BATCH_WAIT
+        )
+        self._ct2_batch_scheduler = _BatchScheduler(
+            self._generate_ct2_replies, DIALOGPT_MAX_BATCH_SIZE, DIALOGPT_MAX_BATCH_WAIT
+        )
         self.career_knowledge_base = self._load_career_knowledge()
+        self._index_career_knowledge()
         self._initialize_models()
     
     def _initialize_models(self):
@@ -76,12 +326,32 @@ class ConversationalAIService:
                 # Use DialoGPT-medium for better responses
                 model_name = "microsoft/DialoGPT-medium"
                 
-                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                self.model = AutoModelForCausalLM.from_pretrained(model_name)
+                self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+                self.tokenizer.padding_side = "left"
                 
                 # Add padding token if not present
                 if self.tokenizer.pad_token is None:
                     self.tokenizer.pad_token = self.tokenizer.eos_token
+                self._eos_id = self.tokenizer.eos_token_id
+                self._pad_id = self.tokenizer.pad_token_id
+                
+                # CPU-only hosts prefer a CTranslate2 int8 export when one is configured
+                if not torch.cuda.is_available():
+                    self._initialize_ct2_generator()
+                    if self.ct2_generator is not None:
+                        return
+                
+                self.model = AutoModelForCausalLM.from_pretrained(model_name, **self._model_load_kwargs())
+                
+                # Quantized models are already placed by device_map; half-precision weights need moving
+                if torch.cuda.is_available() and not getattr(self.model, "is_loaded_in_8bit", False):
+                    self.model = self.model.to("cuda")
+                self.model.eval()
+                self.model = self._optimize_model(self.model)
+                
+                # Trigger compilation before serving traffic
+                if settings.CHAT_TORCH_COMPILE:
+                    self._decode_replies([(None, [self._eos_id], None)])
                 
                 logger.info("DialoGPT model initialized successfully")
             else:
@@ -90,6 +360,53 @@ class ConversationalAIService:
         except Exception as e:
             logger.error(f"Error initializing DialoGPT model: {e}")
     
+    def _initialize_ct2_generator(self):
+        """Load the CTranslate2-converted DialoGPT, falling back to PyTorch on failure"""
+        model_dir = settings.CHAT_CT2_MODEL_DIR
+        if not model_dir or not CTRANSLATE2_AVAILABLE:
+            return
+        
+        try:
+            self.ct2_generator = ctranslate2.Generator(model_dir, device="cpu", compute_type="int8")
+            logger.info("CTranslate2 DialoGPT generator loaded")
+        except Exception as e:
+            logger.warning(f"CTranslate2 DialoGPT generator unavailable, using PyTorch: {e}")
+            self.ct2_generator = None
+    
+    def _model_load_kwargs(self) -> Dict[str, Any]:
+        """Choose DialoGPT weight precision: int8 on GPU with bitsandbytes, bf16/fp16 on GPU otherwise"""
+        if not torch.cuda.is_available():
+            return {}
+        
+        half_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        
+        # Generation is memory-bound at batch size 1, so halving weight bytes speeds up every token
+        if BITSANDBYTES_AVAILABLE:
+            return {
+                "quantization_config": BitsAndBytesConfig(load_in_8bit=True),
+                "device_map": "auto",
+                "torch_dtype": torch.float16
+            }
+        
+        return {"torch_dtype": half_dtype}
+    
+    def _optimize_model(self, model: Any) -> Any:
+        """Use fused attention kernels and optionally compile the forward pass"""
+        # Recent transformers already run GPT-2 attention through SDPA; older ones need BetterTransformer
+        attn_implementation = getattr(model.config, "_attn_implementation", "eager")
+        if (BETTER_TRANSFORMER_AVAILABLE and attn_implementation == "eager"
+                and not getattr(model, "is_loaded_in_8bit", False)):
+            try:
+                model = BetterTransformer.transform(model)
+            except Exception as e:
+                logger.warning(f"BetterTransformer not applied to DialoGPT: {e}")
+        
+        # The KV cache grows every step, so compile for dynamic shapes rather than CUDA graphs
+        if settings.CHAT_TORCH_COMPILE:
+            model.forward = torch.compile(model.forward, dynamic=True)
+        
+        return model
+    
     def _load_career_knowledge(self) -> Dict[str, Any]:
         """Load career coaching knowledge base"""
         return {
@@ -143,16 +460,16 @@ class ConversationalAIService:
     ) -> str:
         """Start a new conversation session"""
         try:
-            session_id = f"session_{user_id}_{datetime.utcnow().timestamp()}"
+            session_id = uuid.uuid4().hex
+            now = time.time_ns()
             
             session = ConversationSession(
                 session_id=session_id,
                 user_id=user_id,
-                messages=[],
                 context=context,
                 user_profile=user_profile or {},
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+                created_at=now,
+                updated_at=now
             )
             
             self.conversation_sessions[session_id] = session
@@ -164,10 +481,10 @@ class ConversationalAIService:
             greeting_message = ConversationMessage(
                 role="assistant",
                 content=greeting,
-                timestamp=datetime.utcnow(),
+                timestamp=now,
                 context=context
             )
-            session.messages.append(greeting_message)
+            session.add_message(greeting_message)
             
             logger.info(f"Started conversation session {session_id} for user {user_id}")
             return session_id
@@ -180,9 +497,10 @@ class ConversationalAIService:
         self, 
         session_id: str, 
         message: str,
-        context: ConversationContext = None
+        context: ConversationContext = None,
+        on_text: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
-        """Send a message and get AI response"""
+        """Send a message and get AI response; on_text receives DialoGPT text as it is decoded"""
         try:
             if session_id not in self.conversation_sessions:
                 raise ValueError(f"Session {session_id} not found")
@@ -193,25 +511,27 @@ class ConversationalAIService:
             user_message = ConversationMessage(
                 role="user",
                 content=message,
-                timestamp=datetime.utcnow(),
+                timestamp=time.time_ns(),
                 context=context or session.context
             )
-            session.messages.append(user_message)
+            session.add_message(user_message)
             
             # Generate AI response
-            response = await self._generate_response(session, message)
+            response = await self._generate_response(session, message, on_text)
             
             # Add AI response
             ai_message = ConversationMessage(
                 role="assistant",
                 content=response["content"],
-                timestamp=datetime.utcnow(),
+                timestamp=time.time_ns(),
                 context=context or session.context,
                 metadata=response.get("metadata", {})
             )
-            session.messages.append(ai_message)
+            session.add_message(ai_message)
             
-            session.updated_at = datetime.utcnow()
+            session.updated_at = ai_message.timestamp
+            # Re-insert to restart the idle timer
+            self.conversation_sessions[session_id] = session
             
             return {
                 "session_id": session_id,
@@ -219,7 +539,7 @@ class ConversationalAIService:
                 "context": ai_message.context.value,
                 "suggestions": response.get("suggestions", []),
                 "metadata": response.get("metadata", {}),
-                "timestamp": ai_message.timestamp.isoformat()
+                "timestamp": _ns_to_iso(ai_message.timestamp)
             }
             
         except Exception as e:
@@ -228,13 +548,48 @@ class ConversationalAIService:
                 "session_id": session_id,
                 "response": "I apologize, but I'm having trouble processing your message right now. Could you please try again?",
                 "error": str(e),
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": _ns_to_iso(time.time_ns())
             }
     
+    async def send_message_stream(
+        self, 
+        session_id: str, 
+        message: str,
+        context: ConversationContext = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Send a message and yield the AI response as text chunks, then the full send_message result"""
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue()
+        
+        # Chunks arrive from the decode thread; the final None is queued after all of them
+        def on_text(text: str):
+            loop.call_soon_threadsafe(chunks.put_nowait, text)
+        
+        task = asyncio.create_task(self.send_message(session_id, message, context, on_text=on_text))
+        task.add_done_callback(lambda _: chunks.put_nowait(None))
+        
+        streamed = ""
+        try:
+            while (text := await chunks.get()) is not None:
+                streamed += text
+                yield {"type": "text", "content": text}
+            
+            response = await task
+        finally:
+            task.cancel()
+        
+        # Career answers, fallbacks and coaching follow-ups are not decoded token by token
+        content = response["response"]
+        if content.startswith(streamed) and len(content) > len(streamed):
+            yield {"type": "text", "content": content[len(streamed):]}
+        
+        yield {"type": "done", **response}
+    
     async def _generate_response(
         self, 
         session: ConversationSession, 
-        user_message: str
+        user_message: str,
+        on_text: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """Generate AI response using DialoGPT and career knowledge"""
         try:
@@ -248,8 +603,8 @@ class ConversationalAIService:
                 return career_response
             
             # Use DialoGPT for general conversation
-            if self.model and self.tokenizer:
-                dialogpt_response = await self._generate_dialogpt_response(session, user_message)
+            if (self.model or self.ct2_generator) and self.tokenizer:
+                dialogpt_response = await self._generate_dialogpt_response(session, user_message, on_text)
                 
                 # Enhance with career coaching elements
                 enhanced_response = self._enhance_with_career_coaching(
@@ -271,52 +626,286 @@ class ConversationalAIService:
     async def _generate_dialogpt_response(
         self, 
         session: ConversationSession, 
-        user_message: str
+        user_message: str,
+        on_text: Optional[Callable[[str], None]] = None
     ) -> str:
-        """Generate response using DialoGPT model"""
+        """Generate response using DialoGPT model, reusing the session's attention cache"""
         try:
-            # Prepare conversation history
-            conversation_history = []
-            for msg in session.messages[-5:]:  # Last 5 messages for context
-                conversation_history.append(msg.content)
-            
-            conversation_history.append(user_message)
-            
-            # Encode conversation
-            input_text = " ".join(conversation_history)
-            input_ids = self.tokenizer.encode(input_text, return_tensors="pt")
-            
-            # Generate response
-            with torch.no_grad():
-                output = self.model.generate(
-                    input_ids,
-                    max_length=input_ids.shape[1] + 50,
-                    num_return_sequences=1,
-                    temperature=0.7,
-                    do_sample=True,
-                    pad_token_id=self.tokenizer.eos_token_id
-                )
+            if self.ct2_generator is not None:
+                reply_ids = await self._ct2_batch_scheduler.submit(self._build_dialogpt_context(session))
+                response = self.tokenizer.decode(reply_ids, skip_special_tokens=True).strip()
+                return response if response else "I understand. Could you tell me more about that?"
+            
+            past_key_values, new_ids = self._prepare_dialogpt_turn(session)
+            
+            # Feed only the turns the cache has not seen, then decode the reply
+            # alongside any other sessions' turns arriving at the same time
+            on_token = self._text_streamer(on_text) if on_text is not None else None
+            reply_ids, past_key_values = await self._batch_scheduler.submit((past_key_values, new_ids, on_token))
+            
+            # The assistant message appended after this reply is covered by the cache too
+            self._kv_caches[session.session_id] = DialogptCacheState(
+                past_key_values=past_key_values,
+                message_count=session.message_count + 1
+            )
             
             # Decode response
-            response = self.tokenizer.decode(
-                output[0][input_ids.shape[1]:], 
-                skip_special_tokens=True
-            ).strip()
+            response = self.tokenizer.decode(reply_ids, skip_special_tokens=True).strip()
             
             return response if response else "I understand. Could you tell me more about that?"
             
         except Exception as e:
             logger.error(f"Error with DialoGPT generation: {e}")
+            self._kv_caches.pop(session.session_id, None)
             return "I'm here to help. Could you elaborate on what you'd like to discuss?"
     
+    def _prepare_dialogpt_turn(self, session: ConversationSession) -> Tuple[Any, List[int]]:
+        """Return the session's KV cache and the token ids of messages it has not seen yet"""
+        eos_id = self._eos_id
+        state = self._kv_caches.get(session.session_id)
+        
+        unseen = session.message_count - state.message_count if state is not None else 0
+        if state is not None and unseen <= len(session.messages):
+            # Close the previous reply, then append each unseen turn followed by EOS
+            unseen_messages = session.recent_messages(unseen)
+            self._tokenize_messages(unseen_messages)
+            new_ids = [eos_id]
+            for msg in unseen_messages:
+                new_ids.extend(msg.token_ids)
+                new_ids.append(eos_id)
+            
+            max_positions = self.model.config.max_position_embeddings
+            if self._cache_length(state.past_key_values) + len(new_ids) + DIALOGPT_MAX_NEW_TOKENS <= max_positions:
+                return state.past_key_values, new_ids
+        
+        # No usable cache: rebuild the context from the most recent messages
+        return None, self._build_dialogpt_context(session)
+    
+    def _build_dialogpt_context(self, session: ConversationSession) -> List[int]:
+        """Token ids of the most recent messages, each followed by EOS"""
+        eos_id = self._eos_id
+        recent_messages = session.recent_messages(DIALOGPT_HISTORY_MESSAGES)
+        self._tokenize_messages(recent_messages)
+        context_ids = []
+        for msg in recent_messages:
+            context_ids.extend(msg.token_ids)
+            context_ids.append(eos_id)
+        
+        # Keep the newest tokens so the context plus the reply fits the position table
+        if self.model is not None:
+            max_positions = self.model.config.max_position_embeddings
+        else:
+            max_positions = self.tokenizer.model_max_length
+        return context_ids[-(max_positions - DIALOGPT_MAX_NEW_TOKENS):]
+    
+    def _generate_ct2_replies(self, requests: List[List[int]]) -> List[List[int]]:
+        """Decode one reply per context with the CTranslate2 generator"""
+        results = self.ct2_generator.generate_batch(
+            [self.tokenizer.convert_ids_to_tokens(context_ids) for context_ids in requests],
+            max_length=DIALOGPT_MAX_NEW_TOKENS,
+            repetition_penalty=DIALOGPT_REPETITION_PENALTY,
+            include_prompt_in_result=False,
+            end_token=self.tokenizer.eos_token
+        )
+        return [result.sequences_ids[0] for result in results]
+    
+    def _tokenize_messages(self, messages: List[ConversationMessage]):
+        """Fill in token ids for messages not yet encoded, in one batched tokenizer call"""
+        pending = [msg for msg in messages if msg.token_ids is None]
+        if not pending:
+            return
+        
+        encoded = self.tokenizer(
+            [msg.content for msg in pending],
+            add_special_tokens=False,
+            truncation=True,
+            max_length=DIALOGPT_MAX_MESSAGE_TOKENS
+        )
+        for msg, token_ids in zip(pending, encoded["input_ids"]):
+            msg.token_ids = token_ids
+    
+    def _text_streamer(self, on_text: Callable[[str], None]) -> Callable[[int], None]:
+        """Turn decoded token ids into text deltas, holding back incomplete UTF-8 characters"""
+        token_ids = []
+        emitted = 0
+        
+        def on_token(token_id: int):
+            nonlocal emitted
+            token_ids.append(token_id)
+            text = self.tokenizer.decode(token_ids, skip_special_tokens=True)
+            if len(text) > emitted and not text.endswith("\ufffd"):
+                on_text(text[emitted:])
+                emitted = len(text)
+        
+        return on_token
+    
+    def _decode_replies(
+        self, requests: List[Tuple[Any, List[int], Optional[Callable[[int], None]]]]
+    ) -> List[Tuple[List[int], Any]]:
+        """Decode replies for several sessions in shared forward passes over their padded KV caches"""
+        device = self.model.device
+        eos_id = self._eos_id
+        pad_id = self._pad_id
+        batch_size = len(requests)
+        
+        caches = [None if past is None else _cache_layers(past) for past, _, _ in requests]
+        streams = [on_token for _, _, on_token in requests]
+        past_lengths = [0 if cache is None else cache[0][0].size(-2) for cache in caches]
+        max_past = max(past_lengths)
+        max_new = max(len(new_ids) for _, new_ids, _ in requests)
+        
+        # Left-pad caches and new tokens so every row's real tokens end at the same column;
+        # the attention mask hides the padding and positions are counted over real tokens only.
+        # Pinned host buffers (reused by torch's caching host allocator) make the copies asynchronous
+        pin_memory = device.type == "cuda"
+        input_ids = torch.full((batch_size, max_new), pad_id, dtype=torch.long, pin_memory=pin_memory)
+        attention_mask = torch.zeros((batch_size, max_past + max_new), dtype=torch.long, pin_memory=pin_memory)
+        for row, ((_, new_ids, _), past_length) in enumerate(zip(requests, past_lengths)):
+            input_ids[row, max_new - len(new_ids):] = torch.tensor(new_ids)
+            attention_mask[row, max_past - past_length:max_past] = 1
+            attention_mask[row, max_past + max_new - len(new_ids):] = 1
+        input_ids = input_ids.to(device, non_blocking=True)
+        attention_mask = attention_mask.to(device, non_blocking=True)
+        past_key_values = _build_cache(self._pad_caches(caches, past_lengths, max_past))
+        
+        active = torch.ones(batch_size, dtype=torch.bool, device=device)
+        seen = None  # (batch, vocab) tokens already in this turn, for the repetition penalty
+        step_ids = []
+        step_active = []
+        
+        with torch.inference_mode():
+            for step in range(DIALOGPT_MAX_NEW_TOKENS + 1):
+                position_ids = (attention_mask.cumsum(-1) - 1).clamp(min=0)[:, -input_ids.size(1):]
+                outputs = self.model(
+                    input_ids=input_ids,
+                    past_key_values=past_key_values,
+                    attention_mask=attention_mask,
+                    position_ids=position_ids,
+                    use_cache=True
+                )
+                past_key_values = outputs.past_key_values
+                # Replies cut off at the token limit still need their last token in the cache
+                if step == DIALOGPT_MAX_NEW_TOKENS:
+                    break
+                
+                logits = outputs.logits[:, -1, :]
+                if seen is None:
+                    # Padding columns repeat the row's last token so the pad id is not marked seen
+                    real_ids = torch.where(attention_mask[:, -input_ids.size(1):].bool(), input_ids, input_ids[:, -1:])
+                    seen = torch.zeros(logits.shape, dtype=torch.bool, device=device).scatter_(1, real_ids, True)
+                
+                # Rows that produced EOS stop; they keep feeding masked padding until all are done
+                next_ids = self._greedy_next_tokens(logits, seen)
+                seen.scatter_(1, next_ids.unsqueeze(-1), True)
+                active = active & (next_ids != eos_id)
+                step_ids.append(next_ids)
+                step_active.append(active)
+                # Streaming turns see each token as soon as it is chosen
+                if any(streams):
+                    for on_token, token_id, is_active in zip(streams, next_ids.tolist(), active.tolist()):
+                        if on_token is not None and is_active:
+                            on_token(token_id)
+                if not active.any():
+                    break
+                
+                input_ids = torch.where(active, next_ids, pad_id).unsqueeze(-1)
+                attention_mask = torch.cat([attention_mask, active.long().unsqueeze(-1)], dim=-1)
+        
+        generated = torch.stack(step_ids, dim=1).cpu()
+        generated_active = torch.stack(step_active, dim=1).cpu()
+        reply_ids = [generated[row][generated_active[row]].tolist() for row in range(batch_size)]
+        
+        return list(zip(reply_ids, self._split_caches(past_key_values, attention_mask)))
+    
+    def _pad_caches(self, caches: List[Any], lengths: List[int], max_length: int) -> Any:
+        """Left-pad per-session (key, value) caches to a common length and stack them as one batch"""
+        if max_length == 0:
+            return None
+        
+        template = next(cache for cache in caches if cache is not None)
+        layers = []
+        for layer_index, (template_key, template_value) in enumerate(template):
+            keys = []
+            values = []
+            for cache, length in zip(caches, lengths):
+                if cache is None:
+                    shape = (1, template_key.size(1), max_length, template_key.size(3))
+                    keys.append(template_key.new_zeros(shape))
+                    values.append(template_value.new_zeros(shape))
+                else:
+                    key, value = cache[layer_index]
+                    keys.append(F.pad(key, (0, 0, max_length - length, 0)))
+                    values.append(F.pad(value, (0, 0, max_length - length, 0)))
+            layers.append((torch.cat(keys), torch.cat(values)))
+        
+        return tuple(layers)
+    
+    def _split_caches(self, past_key_values: Any, attention_mask: "torch.Tensor") -> List[Any]:
+        """Split a batched cache back into per-session caches, dropping padded positions"""
+        cache = _cache_layers(past_key_values)
+        keep = attention_mask[:, :cache[0][0].size(-2)].bool()
+        
+        return [
+            tuple((key[row:row + 1, :, keep[row]], value[row:row + 1, :, keep[row]]) for key, value in cache)
+            for row in range(keep.size(0))
+        ]
+    
+    def _greedy_next_tokens(self, logits: "torch.Tensor", seen: "torch.Tensor") -> "torch.Tensor":
+        """Greedy choice per row after applying the repetition penalty to tokens already seen"""
+        logits = logits.float()
+        penalized = torch.where(
+            logits > 0, logits / DIALOGPT_REPETITION_PENALTY, logits * DIALOGPT_REPETITION_PENALTY
+        )
+        return torch.where(seen, penalized, logits).argmax(dim=-1)
+    
+    @staticmethod
+    def _cache_length(past_key_values: Any) -> int:
+        """Number of tokens held in a DialoGPT KV cache"""
+        return _cache_layers(past_key_values)[0][0].size(-2)
+    
+    def _index_career_knowledge(self):
+        """Flatten the knowledge base into per-context lookup tables"""
+        self._responses = {
+            ConversationContext(context_name): tuple(context_data.get("responses", []))
+            for context_name, context_data in self.career_knowledge_base.items()
+        }
+        
+        # (context, lowercased keywords) in knowledge-base order; earlier contexts win on ties
+        self._keyword_index = tuple(
+            (
+                ConversationContext(context_name),
+                tuple(sys.intern(keyword.lower()) for keyword in context_data.get("keywords", []))
+            )
+            for context_name, context_data in self.career_knowledge_base.items()
+        )
+        
+        self._context_automaton = None
+        if AHOCORASICK_AVAILABLE:
+            keyword_priority = {}
+            for priority, (_, keywords) in enumerate(self._keyword_index):
+                for keyword in keywords:
+                    keyword_priority.setdefault(keyword, priority)
+            
+            self._context_automaton = ahocorasick.Automaton()
+            for keyword, priority in keyword_priority.items():
+                self._context_automaton.add_word(keyword, priority)
+            self._context_automaton.make_automaton()
+    
     def _detect_context(self, message: str) -> ConversationContext:
         """Detect conversation context from user message"""
         message_lower = message.lower()
         
-        for context_name, context_data in self.career_knowledge_base.items():
-            keywords = context_data.get("keywords", [])
+        if self._context_automaton is not None:
+            priority = min(
+                (priority for _, priority in self._context_automaton.iter(message_lower)), default=None
+            )
+            if priority is not None:
+                return self._keyword_index[priority][0]
+            return ConversationContext.GENERAL
+        
+        for context, keywords in self._keyword_index:
             if any(keyword in message_lower for keyword in keywords):
-                return ConversationContext(context_name)
+                return context
         
         return ConversationContext.GENERAL
     
@@ -331,14 +920,12 @@ class ConversationalAIService:
             if context == ConversationContext.GENERAL:
                 return None
             
-            context_data = self.career_knowledge_base.get(context.value, {})
-            responses = context_data.get("responses", [])
-            
+            responses = self._responses.get(context)
             if not responses:
                 return None
             
             # Select appropriate response (simple round-robin for demo)
-            response_index = len(session.messages) % len(responses)
+            response_index = session.message_count % len(responses)
             base_response = responses[response_index]
             
             # Personalize based on user profile
@@ -405,34 +992,7 @@ class ConversationalAIService:
         user_profile: Dict[str, Any]
     ) -> List[str]:
         """Generate conversation suggestions based on context"""
-        suggestions_map = {
-            ConversationContext.CAREER_GUIDANCE: [
-                "What are my career strengths?",
-                "How do I set career goals?",
-                "What industries should I consider?"
-            ],
-            ConversationContext.SKILL_DEVELOPMENT: [
-                "What skills are in demand?",
-                "How do I learn new technologies?",
-                "Should I get certifications?"
-            ],
-            ConversationContext.JOB_SEARCH: [
-                "How do I improve my resume?",
-                "Where should I look for jobs?",
-                "How do I network effectively?"
-            ],
-            ConversationContext.INTERVIEW_PREP: [
-                "What are common interview questions?",
-                "How do I handle technical interviews?",
-                "What questions should I ask?"
-            ]
-        }
-        
-        return suggestions_map.get(context, [
-            "Tell me about your career goals",
-            "What challenges are you facing?",
-            "How can I help you today?"
-        ])
+        return list(self._SUGGESTIONS.get(context, self._DEFAULT_SUGGESTIONS))
     
     def _enhance_with_career_coaching(
         self, 
@@ -447,14 +1007,7 @@ class ConversationalAIService:
             
             # Add follow-up questions based on context
             if context != ConversationContext.GENERAL:
-                follow_ups = {
-                    ConversationContext.CAREER_GUIDANCE: " What specific career goals are you working towards?",
-                    ConversationContext.SKILL_DEVELOPMENT: " Which skills would you like to focus on developing?",
-                    ConversationContext.JOB_SEARCH: " What type of roles are you most interested in?",
-                    ConversationContext.INTERVIEW_PREP: " What kind of interview are you preparing for?"
-                }
-                
-                follow_up = follow_ups.get(context, "")
+                follow_up = self._FOLLOW_UPS.get(context, "")
                 if follow_up:
                     enhanced_response += follow_up
             
@@ -483,17 +1036,9 @@ class ConversationalAIService:
         session: ConversationSession
     ) -> Dict[str, Any]:
         """Generate fallback response when models aren't available"""
-        fallback_responses = [
-            "That's an interesting point. Could you tell me more about your specific situation?",
-            "I understand your concern. What would you like to focus on first?",
-            "Let's explore that together. What's your main goal in this area?",
-            "That's a great question. What's been your experience with this so far?",
-            "I'm here to help you succeed. What specific guidance are you looking for?"
-        ]
-        
         # Simple response selection based on message length
-        response_index = len(message) % len(fallback_responses)
-        response = fallback_responses[response_index]
+        response_index = len(message) % len(self._FALLBACK_RESPONSES)
+        response = self._FALLBACK_RESPONSES[response_index]
         
         suggestions = self._generate_suggestions(context, session.user_profile)
         
@@ -515,15 +1060,7 @@ class ConversationalAIService:
         try:
             base_greeting = "Hello! I'm your AI career coach, here to help you achieve your professional goals."
             
-            context_greetings = {
-                ConversationContext.CAREER_GUIDANCE: "I'm excited to help you explore your career path and set meaningful goals.",
-                ConversationContext.SKILL_DEVELOPMENT: "Let's work together to identify and develop the skills that will advance your career.",
-                ConversationContext.JOB_SEARCH: "I'm here to guide you through your job search journey and help you find the right opportunities.",
-                ConversationContext.INTERVIEW_PREP: "Let's prepare you for interview success with practice and strategic guidance.",
-                ConversationContext.SALARY_NEGOTIATION: "I'll help you approach salary negotiations with confidence and strategy."
-            }
-            
-            context_specific = context_greetings.get(context, "")
+            context_specific = self._CONTEXT_GREETINGS.get(context, "")
             
             if user_profile:
                 name = user_profile.get("name", "")
@@ -555,7 +1092,7 @@ class ConversationalAIService:
                 history.append({
                     "role": message.role,
                     "content": message.content,
-                    "timestamp": message.timestamp.isoformat(),
+                    "timestamp": _ns_to_iso(message.timestamp),
                     "context": message.context.value,
                     "metadata": message.metadata or {}
                 })
@@ -566,6 +1103,12 @@ class ConversationalAIService:
             logger.error(f"Error getting conversation history: {e}")
             return []
     
+    def _release_evicted_kv_caches(self):
+        """Free the GPU attention caches of sessions no longer in memory"""
+        for session_id in list(self._kv_caches):
+            if session_id not in self.conversation_sessions:
+                self._kv_caches.pop(session_id, None)
+    
     async def end_conversation(self, session_id: str) -> Dict[str, Any]:
         """End a conversation session"""
         try:
@@ -574,7 +1117,8 @@ class ConversationalAIService:
             
             session = self.conversation_sessions[session_id]
             session.is_active = False
-            session.updated_at = datetime.utcnow()
+            self._kv_caches.pop(session_id, None)
+            session.updated_at = time.time_ns()
             
             # Generate conversation summary
             summary = self._generate_conversation_summary(session)
@@ -582,9 +1126,9 @@ class ConversationalAIService:
             return {
                 "session_id": session_id,
                 "summary": summary,
-                "message_count": len(session.messages),
-                "duration": (session.updated_at - session.created_at).total_seconds(),
-                "ended_at": session.updated_at.isoformat()
+                "message_count": session.message_count,
+                "duration": (session.updated_at - session.created_at) / 1e9,
+                "ended_at": _ns_to_iso(session.updated_at)
             }
             
         except Exception as e:
@@ -603,20 +1147,12 @@ class ConversationalAIService:
                 return "Conversation consisted only of system messages."
             
             # Simple summary based on context and message count
-            context_summaries = {
-                ConversationContext.CAREER_GUIDANCE: "Discussed career goals and professional development",
-                ConversationContext.SKILL_DEVELOPMENT: "Explored skill development opportunities and learning paths",
-                ConversationContext.JOB_SEARCH: "Covered job search strategies and opportunities",
-                ConversationContext.INTERVIEW_PREP: "Prepared for upcoming interviews and practice sessions",
-                ConversationContext.SALARY_NEGOTIATION: "Discussed salary negotiation strategies and tactics"
-            }
-            
-            base_summary = context_summaries.get(
+            base_summary = self._CONTEXT_SUMMARIES.get(
                 session.context, 
                 "General career coaching conversation"
             )
             
-            return f"{base_summary}. Exchanged {len(session.messages)} messages over {len(user_messages)} user interactions."
+            return f"{base_summary}. Exchanged {session.message_count} messages over {len(user_messages)} user interactions."
             
         except Exception as e:
             logger.error(f"Error generating summary: {e}")
@@ -0,0 +1,252 @@
+"""
+SkillForge AI - Cache Service Tests
+Unit tests for cache payload encoding and the in-process hot-key cache
+"""
+
+import asyncio
+import fnmatch
+import pickle
+
+import pytest
+
+from app.services.cache_service import (
+    COMPRESSION_THRESHOLD, _FMT_LZ4, _FMT_MSGPACK, _FMT_ORJSON, _FMT_PICKLE,
+    CacheService, _decode, _encode
+)
+
+class FakeRedis:
+    """In-memory stand-in for the asyncio Redis client used by CacheService."""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = []
+        self.read_gate = None
+
+    @staticmethod
+    def _key(key):
+        return key.encode() if isinstance(key, str) else key
+
+    def register_script(self, script):
+        async def run(keys, args):
+            for key, value in zip(keys, args):
+                self.data[self._key(key)] = value
+            return len(keys)
+        return run
+
+    async def get(self, key):
+        self.calls.append(('get', key))
+        value = self.data.get(self._key(key))
+        if self.read_gate is not None:
+            # Return the value as read before the gate opened, like a reply still in flight
+            await self.read_gate.wait()
+        return value
+
+    async def getex(self, key, ex=None):
+        self.calls.append(('getex', key))
+        return self.data.get(self._key(key))
+
+    async def set(self, key, value, ex=None, nx=False):
+        self.calls.append(('set', key))
+        if nx and self._key(key) in self.data:
+            return None
+        self.data[self._key(key)] = value
+        return True
+
+    async def mget(self, keys):
+        return [self.data.get(self._key(key)) for key in keys]
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(self._key(key), None) is not None for key in keys)
+
+    async def unlink(self, *keys):
+        return await self.delete(*keys)
+
+    async def scan_iter(self, match=None, count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, self._key(match)):
+                yield key
+
+@pytest.fixture
+def cache():
+    """CacheService over an in-memory Redis, with an empty local cache."""
+    CacheService._local.clear()
+    yield CacheService(FakeRedis())
+    CacheService._local.clear()
+
+class TestPayloadEncoding:
+    """Test tagged payload serialization round trips."""
+
+    def test_dict_round_trip(self):
+        """Test JSON-compatible values are stored as orjson."""
+        value = {'id': 42, 'name': 'Ada', 'skills': ['python', 'sql'], 'score': 0.5}
+        payload = _encode(value)
+
+        assert payload[:1] == _FMT_ORJSON
+        assert _decode(payload) == value
+
+    def test_bytes_round_trip(self):
+        """Test bytes values fall back to msgpack and stay bytes."""
+        value = b'\x00\x80binary\xff'
+        payload = _encode(value)
+
+        assert payload[:1] == _FMT_MSGPACK
+        assert _decode(payload) == value
+
+    def test_non_str_keys_round_trip(self):
+        """Test dicts with non-string keys fall back to msgpack and keep their keys."""
+        value = {1: 'one', 2: ['two']}
+        payload = _encode(value)
+
+        assert payload[:1] == _FMT_MSGPACK
+        assert _decode(payload) == value
+
+    def test_large_value_is_compressed(self):
+        """Test payloads over the threshold are lz4-wrapped and decode unchanged."""
+        value = {'text': 'x' * (COMPRESSION_THRESHOLD * 2)}
+        payload = _encode(value)
+
+        assert payload[:1] == _FMT_LZ4
+        assert len(payload) < COMPRESSION_THRESHOLD
+        assert _decode(payload) == value
+
+    def test_small_value_is_not_compressed(self):
+        """Test payloads under the threshold are stored as-is."""
+        assert _encode({'a': 1})[:1] == _FMT_ORJSON
+
+    def test_legacy_untagged_json(self):
+        """Test untagged JSON written before format tags still decodes."""
+        assert _decode(b'{"id": 1, "name": "Ada"}') == {'id': 1, 'name': 'Ada'}
+        assert _decode(b'[1, 2, 3]') == [1, 2, 3]
+
+    def test_legacy_untagged_string(self):
+        """Test untagged non-JSON text decodes to a string."""
+        assert _decode(b'plain text') == 'plain text'
+
+    def test_tagged_pickle_is_a_miss(self):
+        """Test pickled payloads are never unpickled."""
+        assert _decode(_FMT_PICKLE + pickle.dumps({'id': 1})) is None
+
+    def test_missing_value(self):
+        """Test a missing key decodes to None."""
+        assert _decode(None) is None
+
+    def test_unencodable_value(self):
+        """Test values neither serializer supports raise TypeError."""
+        with pytest.raises(TypeError):
+            _encode(object())
+
+class TestLocalCache:
+    """Test the in-process cache in front of the hot user and skill keys."""
+
+    @pytest.mark.asyncio
+    async def test_local_hit_skips_redis(self, cache):
+        """Test a second read is served without a Redis round trip."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        assert await cache.get_cached_user('42') == {'name': 'Ada'}
+        cache.redis.calls.clear()
+
+        assert await cache.get_cached_user('42') == {'name': 'Ada'}
+        assert cache.redis.calls == []
+
+    @pytest.mark.asyncio
+    async def test_callers_get_independent_copies(self, cache):
+        """Test mutating a returned value does not change what later readers see."""
+        await cache.cache_user('42', {'name': 'Ada', 'skills': ['python']})
+        first = await cache.get_cached_user('42')
+        first['skills'].append('sql')
+
+        assert await cache.get_cached_user('42') == {'name': 'Ada', 'skills': ['python']}
+
+    @pytest.mark.asyncio
+    async def test_refresh_ttl_always_reaches_redis(self, cache):
+        """Test sliding expiration is applied even when the value is cached locally."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        await cache.get_cached_user('42')
+        cache.redis.calls.clear()
+
+        assert await cache.get_cached_user('42', refresh_ttl=600) == {'name': 'Ada'}
+        assert cache.redis.calls == [('getex', b'user:42')]
+
+    @pytest.mark.asyncio
+    async def test_write_replaces_local_value(self, cache):
+        """Test a write is visible to the next read in the same process."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        await cache.get_cached_user('42')
+        await cache.cache_user('42', {'name': 'Grace'})
+
+        assert await cache.get_cached_user('42') == {'name': 'Grace'}
+
+    @pytest.mark.asyncio
+    async def test_read_racing_write_does_not_cache_old_value(self, cache):
+        """Test a read that fetched the old value before a write cannot re-cache it."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        cache.redis.read_gate = asyncio.Event()
+        reader = asyncio.create_task(cache.get_cached_user('42'))
+        await asyncio.sleep(0)
+
+        await cache.cache_user('42', {'name': 'Grace'})
+        cache.redis.read_gate.set()
+        assert await reader == {'name': 'Ada'}
+        cache.redis.read_gate = None
+
+        assert await cache.get_cached_user('42') == {'name': 'Grace'}
+
+    @pytest.mark.asyncio
+    async def test_delete_then_get(self, cache):
+        """Test deleting by str key evicts the locally cached bytes key."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        assert await cache.get_cached_user('42') == {'name': 'Ada'}
+
+        await cache.delete('user:42')
+
+        assert await cache.get_cached_user('42') is None
+
+    @pytest.mark.asyncio
+    async def test_delete_many_then_get(self, cache):
+        """Test delete_many evicts every local entry it deletes."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        await cache.cache_skill_data('7', {'name': 'Python'})
+        await cache.get_cached_user('42')
+        await cache.get_cached_skill_data('7')
+
+        await cache.delete_many(['user:42', b'skill:7'])
+
+        assert await cache.get_cached_user('42') is None
+        assert await cache.get_cached_skill_data('7') is None
+
+    @pytest.mark.asyncio
+    async def test_clear_pattern_then_get(self, cache):
+        """Test clear_pattern evicts matching local entries and keeps the rest."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        await cache.cache_skill_data('7', {'name': 'Python'})
+        await cache.get_cached_user('42')
+        await cache.get_cached_skill_data('7')
+
+        await cache.invalidate_user_cache('42')
+
+        assert await cache.get_cached_user('42') is None
+        assert await cache.get_cached_skill_data('7') == {'name': 'Python'}
+
+class TestMultiKeyReads:
+    """Test MGET-based reads degrade per key."""
+
+    @pytest.mark.asyncio
+    async def test_get_many_skips_undecodable_payload(self, cache):
+        """Test one unreadable value does not hide the others."""
+        cache.redis.data[b'good'] = _encode({'id': 1})
+        cache.redis.data[b'legacy'] = pickle.dumps({'id': 2})
+        cache.redis.data[b'corrupt'] = _FMT_MSGPACK + b'\xc1'
+
+        result = await cache.get_many(['good', 'legacy', 'corrupt', 'missing'])
+
+        assert result == {'good': {'id': 1}, 'legacy': None, 'corrupt': None, 'missing': None}
+
+    @pytest.mark.asyncio
+    async def test_user_bundle_skips_undecodable_payload(self, cache):
+        """Test the bundle keeps decodable entries when another is corrupt."""
+        await cache.cache_user('42', {'name': 'Ada'})
+        cache.redis.data[b'job_matches:42'] = _FMT_LZ4 + b'not lz4'
+
+        bundle = await cache.get_user_bundle('42')
+
+        assert bundle == {'user': {'name': 'Ada'}, 'job_matches': None}
@@ -0,0 +1,137 @@
+"""
+SkillForge AI - Conversational AI Service Tests
+Unit tests for batched DialoGPT decoding over per-session KV caches
+"""
+
+import pytest
+from unittest.mock import patch
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from app.services.conversational_ai_service import (
+    DIALOGPT_MAX_NEW_TOKENS, DIALOGPT_REPETITION_PENALTY, KV_CACHE_MAX_TOKENS,
+    ConversationalAIService, DialogptCacheState
+)
+
+EOS_ID = 0
+
+def make_service():
+    """ConversationalAIService without loading DialoGPT."""
+    with patch.object(ConversationalAIService, '_initialize_models'):
+        return ConversationalAIService()
+
+@pytest.fixture(scope="module")
+def service():
+    """Service around a tiny randomly initialized GPT-2."""
+    # Seed and init scale chosen so replies mix early EOS with hitting the token limit
+    torch.manual_seed(2)
+    config = transformers.GPT2Config(
+        vocab_size=64, n_positions=512, n_embd=32, n_layer=2, n_head=2,
+        bos_token_id=EOS_ID, eos_token_id=EOS_ID, initializer_range=0.2
+    )
+    service = make_service()
+    service.model = transformers.GPT2LMHeadModel(config).eval()
+    # DialoGPT has no pad token, so the pad id is the EOS id
+    service._eos_id = EOS_ID
+    service._pad_id = EOS_ID
+    return service
+
+def reference_reply(model, context_ids, turn_ids):
+    """Greedy reply decoded from the full context without a KV cache."""
+    ids = list(context_ids)
+    seen = set(turn_ids)
+    reply = []
+    with torch.inference_mode():
+        for _ in range(DIALOGPT_MAX_NEW_TOKENS):
+            logits = model(torch.tensor([ids])).logits[0, -1].float()
+            for token_id in seen:
+                score = logits[token_id]
+                logits[token_id] = score / DIALOGPT_REPETITION_PENALTY if score > 0 else score * DIALOGPT_REPETITION_PENALTY
+            next_id = int(logits.argmax())
+            if next_id == EOS_ID:
+                break
+            reply.append(next_id)
+            seen.add(next_id)
+            ids.append(next_id)
+    return reply
+
+class TestDecodeReplies:
+    """Test cached, batched decoding matches uncached greedy decoding."""
+
+    def test_first_turn_matches_reference(self, service):
+        """Test a turn without a cache decodes like the uncached model."""
+        context = [5, 9, 13, 2, EOS_ID]
+
+        [(reply, cache)] = service._decode_replies([(None, context, None)])
+
+        assert reply == reference_reply(service.model, context, context)
+        assert service._cache_length(cache) == len(context) + len(reply)
+
+    def test_cached_continuation_matches_reference(self, service):
+        """Test continuing from a split cache decodes like the full uncached context."""
+        context = [7, 3, 11, EOS_ID]
+        [(reply, cache)] = service._decode_replies([(None, context, None)])
+        turn = [EOS_ID, 21, 4, 8, EOS_ID]
+
+        [(next_reply, next_cache)] = service._decode_replies([(cache, turn, None)])
+
+        full_context = context + reply + turn
+        assert next_reply == reference_reply(service.model, full_context, turn)
+        assert service._cache_length(next_cache) == len(full_context) + len(next_reply)
+
+    def test_padded_batch_matches_reference(self, service):
+        """Test sessions with different cache and turn lengths decode as if run alone."""
+        long_context = [6, 1, 30, 14, 2, 9, EOS_ID]
+        [(long_reply, long_cache)] = service._decode_replies([(None, long_context, None)])
+        short_context = [12, EOS_ID]
+        [(short_reply, short_cache)] = service._decode_replies([(None, short_context, None)])
+        long_turn = [EOS_ID, 3, EOS_ID]
+        short_turn = [EOS_ID, 17, 25, 40, 33, EOS_ID]
+        fresh_context = [8, 8, 19, EOS_ID]
+
+        results = service._decode_replies([
+            (long_cache, long_turn, None),
+            (short_cache, short_turn, None),
+            (None, fresh_context, None),
+        ])
+
+        expected = [
+            (long_context + long_reply + long_turn, long_turn),
+            (short_context + short_reply + short_turn, short_turn),
+            (fresh_context, fresh_context),
+        ]
+        for (reply, cache), (full_context, turn) in zip(results, expected):
+            assert reply == reference_reply(service.model, full_context, turn)
+            assert service._cache_length(cache) == len(full_context) + len(reply)
+
+    def test_streamed_tokens_match_reply(self, service):
+        """Test the token callback sees exactly the reply tokens."""
+        streamed = []
+        context = [10, 20, 30, EOS_ID]
+
+        [(reply, _)] = service._decode_replies([(None, context, streamed.append)])
+
+        assert streamed == reply
+
+class TestKvCacheBudget:
+    """Test resident KV caches are bounded by total cached tokens."""
+
+    @staticmethod
+    def state(length):
+        """Cache state holding `length` tokens."""
+        layer = (torch.zeros(1, 2, length, 16), torch.zeros(1, 2, length, 16))
+        return DialogptCacheState(past_key_values=(layer, layer), message_count=1)
+
+    def test_least_recent_sessions_evicted_over_budget(self):
+        """Test adding a cache past the token budget evicts the oldest sessions."""
+        caches = make_service()._kv_caches
+        half = KV_CACHE_MAX_TOKENS // 2
+        caches['a'] = self.state(half)
+        caches['b'] = self.state(half)
+        caches['a']  # 'b' is now least recently used
+
+        caches['c'] = self.state(1)
+
+        assert set(caches) == {'a', 'c'}
+        assert caches.currsize == half + 1
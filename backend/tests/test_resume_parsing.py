@@ -0,0 +1,120 @@
+"""
+SkillForge AI - Resume Parsing Tests
+Unit tests for resume section extraction
+"""
+
+import re
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+
+from app.services.ai_service import SECTION_PATTERNS, ResumeParsingService
+
+RESUME = """Jane Doe
+jane.doe@example.com | (555) 123-4567 | linkedin.com/in/janedoe
+
+PROFESSIONAL SUMMARY
+Backend engineer with eight years of experience building data platforms
+and mentoring teams. Objective: lead a platform group.
+
+Professional Experience
+Senior Engineer, Acme Corp
+Jan 2019 - present
+Led the migration of billing services; technical skills applied daily.
+
+Software Engineer, Initech
+2015 - 2019
+Built reporting pipelines and internal tooling.
+
+EDUCATION
+B.S. Computer Science, State University, 2011 - 2015
+Qualifications: graduated with honors
+
+Technical Skills
+Python, SQL, Kubernetes, Terraform, PostgreSQL, Redis, Kafka, AWS
+
+Projects
+Open-source scheduler (see portfolio at github.com/janedoe)
+
+Certifications
+AWS Certified Solutions Architect; Kubernetes licenses and certificates
+"""
+
+def extract_sections_per_pattern(text):
+    """Section extraction as done before the combined regex, one search per pattern."""
+    section_res = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in SECTION_PATTERNS.items()}
+    sections = {}
+    text_lower = text.lower()
+    for section_name, section_re in section_res.items():
+        match = section_re.search(text_lower)
+        if match:
+            start_pos = match.start()
+            next_section_pos = len(text)
+            for other_re in section_res.values():
+                if other_re is not section_re:
+                    next_match = other_re.search(text_lower, start_pos + 50)
+                    if next_match:
+                        next_section_pos = min(next_section_pos, next_match.start())
+            sections[section_name] = text[start_pos:next_section_pos].strip()
+    return sections
+
+@pytest.fixture
+def parser():
+    """Resume parser; section extraction needs no models."""
+    return ResumeParsingService(ai_service=None)
+
+class TestResumeSections:
+    """Test single-pass section extraction against per-section searches."""
+
+    def test_multi_section_resume_matches_per_pattern_search(self, parser):
+        """Test every section of a full resume is cut at the same offsets as before."""
+        sections = parser._extract_resume_sections(RESUME)
+
+        assert sections == extract_sections_per_pattern(RESUME)
+        assert list(sections) == list(SECTION_PATTERNS)
+
+    def test_sections_start_at_their_headers(self, parser):
+        """Test sections begin at the first matching header and stop at the next one."""
+        sections = parser._extract_resume_sections(RESUME)
+
+        assert sections['education'].startswith('EDUCATION')
+        assert sections['education'].endswith('graduated with honors')
+        # Headers are plain keywords, so the first mention in a body counts
+        assert sections['skills'].startswith('technical skills applied daily')
+        assert sections['projects'].startswith('Projects')
+        assert sections['certifications'].endswith('licenses and certificates')
+
+    def test_nearby_headers_extend_section(self, parser):
+        """Test headers within 50 characters of a section start do not end it."""
+        text = "Summary and skills overview\nExperience at Acme building services for payments teams\nEducation: B.S."
+
+        assert parser._extract_resume_sections(text) == extract_sections_per_pattern(text)
+
+    def test_header_straddling_cutoff_ends_section(self, parser):
+        """Test a header starting before the 50-char cut-off still ends the section at a match past it."""
+        text = "Summary\nBackend engineer with ten years.\n\nProfessional Experience\nAcme Corp, 2015 - present\n"
+
+        sections = parser._extract_resume_sections(text)
+
+        assert sections == extract_sections_per_pattern(text)
+        assert sections['summary'].endswith('Professional')
+
+    def test_sections_ordered_like_patterns(self, parser):
+        """Test sections come back in SECTION_PATTERNS order, not text order."""
+        text = "Skills\nPython, SQL\n\nEducation\nB.S. Computer Science\n\nSummary\nBackend engineer"
+
+        sections = parser._extract_resume_sections(text)
+
+        assert list(sections) == list(extract_sections_per_pattern(text))
+
+    def test_repeated_headers_keep_first_occurrence(self, parser):
+        """Test a header repeated later in the text does not restart its section."""
+        text = RESUME + "\nAdditional experience\nVolunteer work with local schools and skills workshops\n"
+
+        assert parser._extract_resume_sections(text) == extract_sections_per_pattern(text)
+
+    def test_text_without_headers(self, parser):
+        """Test text with no section headers yields no sections."""
+        assert parser._extract_resume_sections("Jane Doe\njane.doe@example.com") == {}